@@ -1,6 +1,7 @@
 import gradio as gr
 import io, sys, os, time, shutil
-import threading, queue
+import threading, queue, glob
+from urllib.parse import quote
 
 # -------------------- 설정 프리셋 --------------------
 VOICES = [
@@ -22,16 +23,50 @@ PRESENTATION_RULES = [
     "짧고 간결한 발표용 대본 중심",
     "자연스러운 대화체로 재작성된 강의 대본",
 ]
+PREVIEW_AUDIO_EXTS = (".mp3", ".wav", ".aac", ".opus")  # 브라우저 재생 가능 형식 (pcm 제외)
+HLS_PLAYLIST = os.path.join("hls", "lecture.m3u8")       # media_dir 기준 점진 재생 플레이리스트
+WEBIO_DIR = "./webio"                                     # 실행별 작업 디렉토리 루트 (정적 경로로 공개)
+GRADIO_FILE_ROUTE = "/gradio_api/file="                   # 정적 파일 URL 접두어 (Gradio 5, Gradio 4는 "/file=")
+
+# 점진 재생 플레이어: gr.Video는 m3u8을 재생하지 못하고 플레이리스트 파일만 캐시로 복사하므로
+# (세그먼트 .ts 누락) 작업 디렉토리를 정적 경로로 공개하고 hls.js로 플레이리스트 URL을 재생
+HLS_PLAYER_HEAD = """
+<script src="https://cdn.jsdelivr.net/npm/hls.js@1"></script>
+<script>
+new MutationObserver(() => {
+  document.querySelectorAll("video[data-hls-src]:not([data-hls-ready])").forEach((video) => {
+    video.dataset.hlsReady = "1";
+    const src = video.dataset.hlsSrc;
+    if (window.Hls && Hls.isSupported()) {
+      const hls = new Hls();
+      hls.loadSource(src);
+      hls.attachMedia(video);
+    } else {
+      video.src = src;   // Safari 기본 HLS
+    }
+  });
+}).observe(document.documentElement, { childList: true, subtree: true });
+</script>
+"""
+
+
+def hls_player_html(playlist_path: str) -> str:
+    """플레이리스트 경로 → 정적 URL을 재생하는 <video> (세그먼트는 같은 디렉토리 기준 상대 경로)"""
+    url = GRADIO_FILE_ROUTE + quote(os.path.abspath(playlist_path))
+    return f'<video data-hls-src="{url}" controls muted playsinline style="width:100%"></video>'
+
 
 # -------------------- 실시간 로그용 파이프라인 실행 --------------------
 def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown, voice_custom,
                            style_dropdown, style_custom, pres_dropdown, pres_custom,
-                           user_prompt_input):
+                           user_prompt_input, speech_streaming=False, hls_output=False):
     """
     Generator: yields (out_video_for_preview, out_video_file_for_download,
-                        out_script_file_for_download, log_text)
+                        out_script_file_for_download, first_audio_preview, hls_player_html, log_text)
     """
     log = ""
+    preview_audio = None
+    hls_preview = None
 
     # ---- 입력 처리 ----
     tone = tone_custom.strip() if tone_custom.strip() else tone_dropdown
@@ -42,11 +77,11 @@ def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown
 
     if pptx_file is None:
         log += "[ERROR] PPT 파일이 업로드되지 않았습니다.\n"
-        yield None, None, None, log
+        yield None, None, None, preview_audio, hls_preview, log
         return
 
     # ---- 작업 디렉토리 및 파일 복사 ----
-    work_dir = os.path.join("./webio", f"run-{int(time.time())}")
+    work_dir = os.path.join(WEBIO_DIR, f"run-{int(time.time())}")
     os.makedirs(work_dir, exist_ok=True)
     pptx_path = os.path.join(work_dir, "input.pptx")
     src_path = getattr(pptx_file, "name", str(pptx_file))
@@ -58,8 +93,10 @@ def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown
     log += f"[INFO] 스타일: {style}\n"
     log += f"[INFO] 대본 규칙: {presentation_rule}\n"
     log += f"[INFO] 유저 프롬프트: {user_prompt}\n"
+    log += f"[INFO] 문장 단위 스트리밍 음성: {'사용' if speech_streaming else '미사용'}\n"
+    log += f"[INFO] 점진 재생(HLS): {'사용' if hls_output else '미사용'}\n"
     # 초기 상태(아직 파일 없음)
-    yield None, None, None, log
+    yield None, None, None, preview_audio, hls_preview, log
 
     # ---- 상태(state) 초기화 ----
     MEDIA_DIR = os.path.join(work_dir, "media")
@@ -75,6 +112,8 @@ def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown
             "presentation_rule": presentation_rule,
             "user_prompt": user_prompt,
         },
+        "speech_streaming": bool(speech_streaming),
+        "hls_output": bool(hls_output),
     }
 
     # -------------------- stdout 캡처 및 스레드 실행 --------------------
@@ -115,15 +154,23 @@ def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown
         try:
             item = q.get(timeout=0.2)
         except queue.Empty:
-            # 주기적 갱신
-            yield None, None, None, log
+            # 주기적 갱신 (첫 음성 클립이 생기면 미리듣기, HLS 플레이리스트가 생기면 점진 재생 플레이어)
+            if preview_audio is None:
+                # 완성된 {page}_tts.<형식>만 사용 ({page}_tts_partNNN 클립은 병합 후 삭제됨)
+                clips = [c for c in glob.glob(os.path.join(MEDIA_DIR, "*_tts.*"))
+                         if c.endswith(PREVIEW_AUDIO_EXTS)]
+                preview_audio = min(clips, key=os.path.getmtime) if clips else None
+            if hls_output and hls_preview is None:
+                playlist = os.path.join(MEDIA_DIR, HLS_PLAYLIST)
+                hls_preview = hls_player_html(playlist) if os.path.exists(playlist) else None
+            yield None, None, None, preview_audio, hls_preview, log
             continue
 
         if item is None:
             break
 
         log += str(item)
-        yield None, None, None, log
+        yield None, None, None, preview_audio, hls_preview, log
 
     # 복원
     sys.stdout = orig_stdout
@@ -134,7 +181,7 @@ def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown
     if "exc" in exception_holder:
         exc = exception_holder["exc"]
         log += f"[ERROR] 실행 중 예외 발생: {exc}\n"
-        yield None, None, None, log
+        yield None, None, None, preview_audio, hls_preview, log
         return
 
     final_state = exception_holder.get("result", {}) or {}
@@ -143,7 +190,7 @@ def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown
 
     if not video_path or not os.path.exists(video_path):
         log += "[WARNING] 영상 파일을 찾을 수 없습니다.\n"
-        yield None, None, None, log
+        yield None, None, None, preview_audio, hls_preview, log
         return
 
     log += f"[INFO] 영상 생성 완료 → {video_path}\n"
@@ -154,10 +201,12 @@ def run_pipeline_ui_stream(pptx_file, tone_dropdown, tone_custom, voice_dropdown
         log += "[WARNING] 스크립트 파일을 찾을 수 없습니다.\n"
 
     # 최종: out_video(미리보기), out_download(파일 경로), out_script_download(스크립트 파일 경로), log
-    yield video_path, video_path, script_path, log
+    yield video_path, video_path, script_path, preview_audio, hls_preview, log
 
 # -------------------- Gradio UI --------------------
-with gr.Blocks(title="AI 강사 Agent", css="""
+gr.set_static_paths(paths=[WEBIO_DIR])
+
+with gr.Blocks(title="AI 강사 Agent", head=HLS_PLAYER_HEAD, css="""
     #fixed-height-file {
         min-height: 180px !important;
         height: 180px !important;
@@ -204,6 +253,8 @@ with gr.Blocks(title="AI 강사 Agent", css="""
             inp_pres_dropdown = gr.Dropdown(PRESENTATION_RULES, value=PRESENTATION_RULES[0], label="대본 제작 방식 (프리셋)")
             inp_pres_custom   = gr.Textbox(value="", label="대본 제작 방식 (커스텀)")
             user_prompt_input = gr.Textbox(label="유저 프롬프트 입력", placeholder="예: 4~6문장으로 요약, 핵심 내용 중심")
+            inp_speech_streaming = gr.Checkbox(value=False, label="문장 단위 스트리밍 음성 (첫 음성 빠르게 듣기)")
+            inp_hls_output = gr.Checkbox(value=False, label="점진 재생 (완성된 슬라이드부터 HLS로 미리보기)")
 
     # 실행 버튼
     run_btn = gr.Button("실행", variant="primary")
@@ -211,11 +262,13 @@ with gr.Blocks(title="AI 강사 Agent", css="""
     # 출력: 영상(한 줄), 그 아래에 다운로드 버튼들을 세로로 배치
     with gr.Column():
         out_video = gr.Video(label="최종 동영상 미리보기", interactive=False)
+        out_audio = gr.Audio(label="첫 음성 미리듣기", type="filepath", interactive=False)
+        out_hls = gr.HTML(label="점진 재생 (HLS)")
         # 다운로드 버튼들을 세로로 배치하려면 각 버튼을 Column에 넣음
         out_download = gr.DownloadButton(label="동영상 다운로드")
         out_script_download = gr.DownloadButton(label="스크립트 다운로드")
 
-    # 클릭 연결: outputs = [out_video_preview, video_file_for_download, script_file_for_download, logbox]
+    # 클릭 연결: outputs = [out_video_preview, video_file_for_download, script_file_for_download, first_audio, hls_player, logbox]
     run_btn.click(
         fn=run_pipeline_ui_stream,
         inputs=[
@@ -229,8 +282,10 @@ with gr.Blocks(title="AI 강사 Agent", css="""
             inp_pres_dropdown,
             inp_pres_custom,
             user_prompt_input,
+            inp_speech_streaming,
+            inp_hls_output,
         ],
-        outputs=[out_video, out_download, out_script_download, logbox],
+        outputs=[out_video, out_download, out_script_download, out_audio, out_hls, logbox],
     )
 
 demo.launch()
@@ -0,0 +1,90 @@
+"""
+bench_deck_raster.py
+- 슬라이드 스냅샷 생성 벤치마크
+- 슬라이드별 변환(export_slide_as_png) vs 덱 단위 1회 변환(export_deck_as_pngs)
+- 슬라이드 수에 따른 wall time 비교
+
+실행:
+    python benchmarks/bench_deck_raster.py --counts 5 10 20 40
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "src")
+for sub in ("parsing", "common"):
+    sys.path.insert(0, os.path.join(ROOT, sub))
+
+from pptx import Presentation
+from pptx.util import Inches, Pt
+
+from ppt_parser import export_slide_as_png, export_deck_as_pngs
+
+
+# ------------------------------------------------------------
+# 테스트용 PPTX 생성
+# ------------------------------------------------------------
+def make_deck(path: str, n_slides: int) -> str:
+    prs = Presentation()
+    layout = prs.slide_layouts[1]
+    for i in range(n_slides):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"슬라이드 {i + 1}"
+        body = slide.placeholders[1].text_frame
+        body.text = "벤치마크용 본문 텍스트"
+        for j in range(3):
+            p = body.add_paragraph()
+            p.text = f"항목 {j + 1}: 덱 래스터화 성능 측정"
+            p.font.size = Pt(20)
+        box = slide.shapes.add_textbox(Inches(1), Inches(6), Inches(8), Inches(1))
+        box.text_frame.text = f"page {i + 1} / {n_slides}"
+    prs.save(path)
+    return path
+
+
+# ------------------------------------------------------------
+# 측정
+# ------------------------------------------------------------
+def bench_per_slide(state: dict, n_slides: int) -> float:
+    start = time.perf_counter()
+    for i in range(n_slides):
+        export_slide_as_png(state, i)
+    return time.perf_counter() - start
+
+
+def bench_deck(state: dict) -> float:
+    start = time.perf_counter()
+    export_deck_as_pngs(state)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--counts", type=int, nargs="+", default=[5, 10, 20, 40])
+    parser.add_argument("--skip-per-slide", action="store_true",
+                        help="슬라이드별 변환 측정 생략 (큰 덱에서 오래 걸림)")
+    args = parser.parse_args()
+
+    print(f"{'slides':>8} | {'per-slide (s)':>14} | {'deck (s)':>10} | {'speedup':>8}")
+    print("-" * 50)
+
+    for n in args.counts:
+        with tempfile.TemporaryDirectory() as tmp:
+            pptx_path = make_deck(os.path.join(tmp, f"deck_{n}.pptx"), n)
+            state = {"pptx_path": pptx_path, "work_dir": os.path.join(tmp, "work")}
+
+            deck_t = bench_deck(state)
+            if args.skip_per_slide:
+                print(f"{n:>8} | {'-':>14} | {deck_t:>10.2f} | {'-':>8}")
+                continue
+
+            per_slide_t = bench_per_slide(state, n)
+            speedup = per_slide_t / deck_t if deck_t > 0 else float("inf")
+            print(f"{n:>8} | {per_slide_t:>14.2f} | {deck_t:>10.2f} | {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+bench_still_encode.py
+- 슬라이드 영상 인코딩 벤치마크 (render_mp4)
+- video_profile default(25fps + scale 필터) vs still(미리 축소 이미지 + 저 fps + stillimage)
+- 슬라이드 1분당 인코딩 시간 / 출력 크기 비교
+
+실행:
+    python benchmarks/bench_still_encode.py --durations 30 60 180
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "src")
+for sub in ("video", "parsing", "generation", "common"):
+    sys.path.insert(0, os.path.join(ROOT, sub))
+
+from PIL import Image, ImageDraw
+
+from video_maker import render_mp4, VIDEO_PROFILES
+
+
+# ------------------------------------------------------------
+# 테스트용 입력 생성
+# ------------------------------------------------------------
+def make_slide_png(path: str, size=(2750, 1547)) -> str:
+    """스냅샷 해상도(220 DPI)와 비슷한 크기의 슬라이드 이미지"""
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle([0, 0, size[0], 180], fill=(30, 60, 120))
+    for i in range(12):
+        y = 260 + i * 100
+        draw.rectangle([150, y, 150 + 180 * (i % 7 + 4), y + 40], fill=(80, 80, 80))
+    draw.ellipse([2000, 600, 2500, 1100], outline=(200, 40, 40), width=12)
+    img.save(path)
+    return path
+
+
+def make_audio(path: str, seconds: float) -> str:
+    """TTS와 같은 24kHz 모노 mp3 (사인파)"""
+    subprocess.check_call([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"sine=frequency=220:sample_rate=24000:duration={seconds}",
+        "-ac", "1", "-c:a", "libmp3lame", "-b:a", "64k", path,
+    ])
+    return path
+
+
+# ------------------------------------------------------------
+# 측정
+# ------------------------------------------------------------
+def bench_profile(image: str, audio: str, seconds: float, profile: str, out_dir: str):
+    out = os.path.join(out_dir, f"{profile}_{int(seconds)}.mp4")
+    start = time.perf_counter()
+    render_mp4(image, audio, out, seconds, video_profile=profile)
+    elapsed = time.perf_counter() - start
+    return elapsed, os.path.getsize(out)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--durations", type=float, nargs="+", default=[30, 60, 180])
+    parser.add_argument("--profiles", nargs="+", default=list(VIDEO_PROFILES))
+    args = parser.parse_args()
+
+    print(f"{'audio (s)':>10} | {'profile':>8} | {'encode (s)':>10} | {'s / slide-min':>13} | {'MB / slide-min':>14}")
+    print("-" * 68)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for seconds in args.durations:
+            # 프로파일마다 새 이미지 (still의 미리 축소 결과 재사용 방지)
+            audio = make_audio(os.path.join(tmp, f"audio_{int(seconds)}.mp3"), seconds)
+            for profile in args.profiles:
+                image = make_slide_png(os.path.join(tmp, f"slide_{profile}_{int(seconds)}.png"))
+                elapsed, size = bench_profile(image, audio, seconds, profile, tmp)
+                minutes = seconds / 60
+                print(f"{seconds:>10.0f} | {profile:>8} | {elapsed:>10.2f} | "
+                      f"{elapsed / minutes:>13.2f} | {size / 1e6 / minutes:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
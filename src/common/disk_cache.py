@@ -0,0 +1,242 @@
+"""
+disk_cache.py
+- 디스크 기반 content-addressed 캐시 (파싱/검색/LLM/TTS 등 공용)
+- 엔트리 = 키 이름의 디렉토리 (여러 파일 저장 가능)
+- 크기 상한 기반 LRU 제거, 선택적 TTL, hit/miss 카운터 (누적 통계는 모아서 기록)
+"""
+
+import os
+import json
+import time
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Any, Dict
+
+
+_COMPLETE = ".complete"   # 엔트리 저장 완료 표시 (mtime = 생성 시각)
+_STATS = "stats.json"
+STATS_FLUSH_EVERY = 50    # 누적 통계(stats.json)는 이 횟수마다 한 번에 기록 (+ 종료 시)
+EVICT_SCAN_EVERY = 100    # 전체 크기 재계산(디렉토리 순회) 주기 (put 횟수, 상한 초과 시에는 즉시)
+
+# 모든 캐시의 기본 상위 폴더
+CACHE_ROOT = os.getenv("MVG_CACHE_DIR", os.path.join("~", ".cache", "multimodal-video-generator"))
+
+
+def cache_dir(name: str) -> str:
+    """캐시 종류별 기본 폴더 (예: cache_dir("parse"))"""
+    return os.path.join(os.path.expanduser(CACHE_ROOT), name)
+
+
+def make_key(*parts: Any) -> str:
+    """여러 값을 합쳐 sha256 키 생성 (dict/list는 정렬된 JSON으로 직렬화)"""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        elif isinstance(part, str):
+            h.update(part.encode("utf-8"))
+        else:
+            h.update(json.dumps(part, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 내용 해시"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ------------------------------------------------------------
+# DiskCache
+# ------------------------------------------------------------
+class DiskCache:
+    """
+    root/<key>/ 디렉토리 단위로 저장하는 캐시.
+    - get(key): 유효한 엔트리 디렉토리 반환 (접근 시각 갱신 → LRU)
+    - put(key, fill): 임시 디렉토리에 fill()로 채운 뒤 원자적으로 rename
+      (같은 키를 동시에 저장하면 먼저 완료된 엔트리를 그대로 사용)
+    - 크기는 put마다 새 엔트리만 더해 추적하고, 상한 초과 / EVICT_SCAN_EVERY회마다 전체 순회
+    """
+
+    def __init__(self, root: str, max_bytes: int, ttl: Optional[float] = None):
+        self.root = Path(root).expanduser()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending: Dict[str, int] = {}     # stats.json에 아직 기록하지 않은 카운터
+        self._size: Optional[int] = None       # 추정 총 크기 (None: 아직 순회 전)
+        self._puts_since_scan = 0
+        atexit.register(self.flush_stats)
+
+    # ---------------- 조회 ----------------
+    def _entry(self, key: str) -> Path:
+        return self.root / key
+
+    def _expired(self, entry: Path) -> bool:
+        if self.ttl is None:
+            return False
+        created = (entry / _COMPLETE).stat().st_mtime
+        return time.time() - created > self.ttl
+
+    def get(self, key: str) -> Optional[Path]:
+        entry = self._entry(key)
+        if (entry / _COMPLETE).exists() and not self._expired(entry):
+            os.utime(entry)  # 마지막 접근 시각 = 디렉토리 mtime
+            self._count("hits")
+            return entry
+
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        self._count("misses")
+        return None
+
+    def get_json(self, key: str, name: str = "value.json") -> Optional[Any]:
+        entry = self.get(key)
+        if entry is None:
+            return None
+        try:
+            with open(entry / name, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # ---------------- 저장 ----------------
+    def _valid(self, entry: Path) -> bool:
+        try:
+            return (entry / _COMPLETE).exists() and not self._expired(entry)
+        except OSError:
+            return False
+
+    def put(self, key: str, fill: Callable[[Path], None]) -> Path:
+        entry = self._entry(key)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.root))
+        try:
+            fill(tmp)
+            (tmp / _COMPLETE).touch()
+            # 다른 스레드/프로세스가 같은 키를 먼저 저장함 → 내용이 같으므로 그대로 사용
+            if self._valid(entry):
+                shutil.rmtree(tmp, ignore_errors=True)
+                return entry
+            if entry.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # rmtree와 replace 사이에 다른 저장이 끝난 경우 (ENOTEMPTY 등)
+                if not self._valid(entry):
+                    raise
+                shutil.rmtree(tmp, ignore_errors=True)
+                return entry
+        except Exception:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+        self._track_put(entry)
+        return entry
+
+    def put_json(self, key: str, value: Any, name: str = "value.json") -> Path:
+        def fill(d: Path):
+            with open(d / name, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+        return self.put(key, fill)
+
+    # ---------------- 제거 ----------------
+    @staticmethod
+    def _entry_size(entry: Path) -> int:
+        return sum(p.stat().st_size for p in entry.rglob("*") if p.is_file())
+
+    def _track_put(self, entry: Path):
+        """새 엔트리 크기만 더하고, 상한 초과 또는 주기가 되면 전체 순회(evict)"""
+        try:
+            added = self._entry_size(entry)
+        except OSError:
+            added = 0
+        with self._lock:
+            self._puts_since_scan += 1
+            if self._size is not None:
+                self._size += added
+            scan = (self._size is None or self._size > self.max_bytes
+                    or self._puts_since_scan >= EVICT_SCAN_EVERY)
+        if scan:
+            self.evict()
+
+    def evict(self):
+        """만료 엔트리 삭제 후 총 크기가 max_bytes 이하가 될 때까지 오래된 순서로 삭제"""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in self.root.iterdir():
+                if not entry.is_dir() or entry.name.startswith(".tmp-"):
+                    continue
+                if not (entry / _COMPLETE).exists() or self._expired(entry):
+                    shutil.rmtree(entry, ignore_errors=True)
+                    continue
+                try:
+                    size = self._entry_size(entry)
+                    entries.append((entry.stat().st_mtime, size, entry))
+                except OSError:
+                    continue   # 다른 스레드가 방금 삭제
+                total += size
+
+            entries.sort()
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+
+            self._size = total
+            self._puts_since_scan = 0
+
+    # ---------------- 통계 ----------------
+    def _count(self, field: str):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+            self._pending[field] = self._pending.get(field, 0) + 1
+            flush = sum(self._pending.values()) >= STATS_FLUSH_EVERY
+        if flush:
+            self.flush_stats()
+
+    def flush_stats(self):
+        """쌓인 카운터를 stats.json 누적값에 한 번에 반영"""
+        with self._lock:
+            if not self._pending:
+                return
+            stats = self._load_stats()
+            for field, n in self._pending.items():
+                stats[field] = stats.get(field, 0) + n
+            try:
+                with open(self.root / _STATS, "w", encoding="utf-8") as f:
+                    json.dump(stats, f)
+                self._pending = {}
+            except OSError:
+                pass
+
+    def _load_stats(self) -> Dict[str, int]:
+        try:
+            with open(self.root / _STATS, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def stats(self) -> Dict[str, int]:
+        """현재 프로세스 카운터 + 누적 카운터"""
+        self.flush_stats()
+        total = self._load_stats()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "total_hits": total.get("hits", 0),
+            "total_misses": total.get("misses", 0),
+        }
@@ -0,0 +1,288 @@
+"""
+media_info.py
+- 음성 파일 길이(초)를 프로세스 안에서 측정 (ffprobe 서브프로세스 없이)
+  MP3: 프레임 헤더 순회 / WAV: RIFF 헤더 / AAC: ADTS 프레임 순회 /
+  Opus(Ogg): 마지막 페이지 granule / PCM: 바이트 길이
+- 그 외 형식만 ffprobe로 측정
+- 샘플레이트 / 채널 수도 같은 헤더에서 읽음 (audio_params, 무음 클립 생성용)
+"""
+
+import os
+import struct
+import subprocess
+from typing import Optional, Tuple
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+PCM_SAMPLE_RATE = 24000      # OpenAI TTS pcm 출력: 24kHz / 16bit / mono
+PCM_SAMPLE_WIDTH = 2
+PCM_CHANNELS = 1
+
+_MP3_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 25: [11025, 12000, 8000]}
+PARAMS_READ_BYTES = 64 * 1024  # audio_params: 파일 앞부분만 읽음
+OPUS_SAMPLE_RATE = 48000       # Opus 디코딩 샘플레이트는 항상 48kHz
+
+_ADTS_SAMPLE_RATES = [96000, 88200, 64000, 48000, 44100, 32000, 24000,
+                      22050, 16000, 12000, 11025, 8000, 7350]
+
+
+# ------------------------------------------------------------
+# 형식별 측정
+# ------------------------------------------------------------
+def _skip_id3(data: bytes) -> int:
+    """ID3v2 태그 길이 (없으면 0)"""
+    if data[:3] != b"ID3" or len(data) < 10:
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def mp3_duration(data: bytes) -> float:
+    """MP3 프레임 헤더를 순회하며 샘플 수 합산 (Xing/Info 헤더 프레임 제외)"""
+    pos = _skip_id3(data)
+    n = len(data)
+    samples = 0
+    sample_rate = 0
+
+    while pos + 4 <= n:
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+            pos += 1
+            continue
+
+        version_bits = (b1 >> 3) & 0x03
+        layer_bits = (b1 >> 1) & 0x03
+        bitrate_idx = b2 >> 4
+        rate_idx = (b2 >> 2) & 0x03
+        if version_bits == 1 or layer_bits == 0 or bitrate_idx in (0, 15) or rate_idx == 3:
+            pos += 1
+            continue
+
+        version = {3: 1, 2: 2, 0: 25}[version_bits]
+        layer = 4 - layer_bits
+        bitrate = _MP3_BITRATES[(1 if version == 1 else 2, layer)][bitrate_idx] * 1000
+        sr = _MP3_SAMPLE_RATES[version][rate_idx]
+        padding = (b2 >> 1) & 0x01
+
+        if layer == 1:
+            frame_len = (12 * bitrate // sr + padding) * 4
+            spf = 384
+        else:
+            spf = 1152 if (layer == 2 or version == 1) else 576
+            frame_len = (spf // 8) * bitrate // sr + padding
+        if frame_len <= 0:
+            pos += 1
+            continue
+
+        # Xing / Info 헤더 프레임은 오디오가 아님
+        mono = (b3 >> 6) == 3
+        side_info = (17 if mono else 32) if version == 1 else (9 if mono else 17)
+        tag = data[pos + 4 + side_info:pos + 8 + side_info]
+        if tag not in (b"Xing", b"Info"):
+            samples += spf
+            sample_rate = sr
+        pos += frame_len
+
+    return samples / sample_rate if sample_rate else 0.0
+
+
+def wav_duration(data: bytes) -> float:
+    """RIFF 헤더의 fmt / data 청크 (스트리밍 WAV의 미확정 data 크기는 파일 길이로 보정)"""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return 0.0
+    pos = 12
+    byte_rate = 0
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        size = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack("<I", data[pos + 16:pos + 20])[0]
+        elif chunk_id == b"data":
+            available = len(data) - (pos + 8)
+            if size == 0 or size > available:
+                size = available
+            return size / byte_rate if byte_rate else 0.0
+        pos += 8 + size + (size & 1)
+    return 0.0
+
+
+def adts_duration(data: bytes) -> float:
+    """AAC(ADTS) 프레임 순회"""
+    pos = _skip_id3(data)
+    samples = 0
+    sample_rate = 0
+    while pos + 7 <= len(data):
+        if data[pos] != 0xFF or (data[pos + 1] & 0xF6) != 0xF0:
+            pos += 1
+            continue
+        rate_idx = (data[pos + 2] >> 2) & 0x0F
+        frame_len = ((data[pos + 3] & 0x03) << 11) | (data[pos + 4] << 3) | (data[pos + 5] >> 5)
+        if rate_idx >= len(_ADTS_SAMPLE_RATES) or frame_len < 7:
+            pos += 1
+            continue
+        sample_rate = _ADTS_SAMPLE_RATES[rate_idx]
+        samples += 1024 * ((data[pos + 6] & 0x03) + 1)
+        pos += frame_len
+    return samples / sample_rate if sample_rate else 0.0
+
+
+def ogg_opus_duration(data: bytes) -> float:
+    """마지막 Ogg 페이지 granule position - pre-skip (48kHz 기준)"""
+    head = data.find(b"OpusHead")
+    last = data.rfind(b"OggS")
+    if head < 0 or last < 0 or last + 14 > len(data):
+        return 0.0
+    pre_skip = struct.unpack("<H", data[head + 10:head + 12])[0]
+    granule = struct.unpack("<q", data[last + 6:last + 14])[0]
+    return max(0.0, (granule - pre_skip) / 48000)
+
+
+def pcm_duration(size: int, sample_rate: int = PCM_SAMPLE_RATE,
+                 channels: int = PCM_CHANNELS, sample_width: int = PCM_SAMPLE_WIDTH) -> float:
+    """헤더 없는 PCM: 바이트 길이로 계산"""
+    return size / (sample_rate * channels * sample_width)
+
+
+def ffprobe_duration(path: str) -> float:
+    """ffprobe로 길이 측정 (프로세스 내 측정이 안 되는 형식용)"""
+    cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-show_entries", "format=duration",
+        "-of", "default=nokey=1:noprint_wrappers=1",
+        path
+    ]
+    try:
+        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode().strip()
+        return float(out)
+    except (subprocess.CalledProcessError, OSError, ValueError):
+        return 0.0
+
+
+# ------------------------------------------------------------
+# 공용 진입점
+# ------------------------------------------------------------
+def media_duration(path: str, pcm_sample_rate: int = PCM_SAMPLE_RATE) -> float:
+    """음성 파일 길이 (초). 측정 실패 시 0.0"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pcm":
+        return pcm_duration(os.path.getsize(path), pcm_sample_rate)
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return 0.0
+
+    duration: Optional[float] = None
+    if data[:4] == b"RIFF":
+        duration = wav_duration(data)
+    elif data[:4] == b"OggS":
+        duration = ogg_opus_duration(data)
+    elif ext in (".aac", ".adts"):
+        duration = adts_duration(data)
+    elif ext == ".mp3":
+        duration = mp3_duration(data)
+
+    if duration:
+        return duration
+    return ffprobe_duration(path)
+
+
+# ------------------------------------------------------------
+# 샘플레이트 / 채널 수
+# ------------------------------------------------------------
+def _mp3_params(data: bytes) -> Optional[Tuple[int, int]]:
+    """첫 유효 MP3 프레임 헤더"""
+    pos = _skip_id3(data)
+    while pos + 4 <= len(data):
+        b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+        version_bits = (b1 >> 3) & 0x03
+        rate_idx = (b2 >> 2) & 0x03
+        if (data[pos] == 0xFF and (b1 & 0xE0) == 0xE0 and version_bits != 1
+                and (b1 >> 1) & 0x03 and (b2 >> 4) not in (0, 15) and rate_idx != 3):
+            version = {3: 1, 2: 2, 0: 25}[version_bits]
+            return _MP3_SAMPLE_RATES[version][rate_idx], 1 if (b3 >> 6) == 3 else 2
+        pos += 1
+    return None
+
+
+def _wav_params(data: bytes) -> Optional[Tuple[int, int]]:
+    """RIFF fmt 청크"""
+    pos = 12
+    while pos + 8 <= len(data):
+        size = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        if data[pos:pos + 4] == b"fmt " and pos + 16 <= len(data):
+            channels, sample_rate = struct.unpack("<HI", data[pos + 10:pos + 16])
+            return sample_rate, channels
+        pos += 8 + size + (size & 1)
+    return None
+
+
+def _adts_params(data: bytes) -> Optional[Tuple[int, int]]:
+    """첫 ADTS 헤더"""
+    pos = _skip_id3(data)
+    while pos + 7 <= len(data):
+        if data[pos] == 0xFF and (data[pos + 1] & 0xF6) == 0xF0:
+            rate_idx = (data[pos + 2] >> 2) & 0x0F
+            channels = ((data[pos + 2] & 0x01) << 2) | (data[pos + 3] >> 6)
+            if rate_idx < len(_ADTS_SAMPLE_RATES) and channels:
+                return _ADTS_SAMPLE_RATES[rate_idx], channels
+        pos += 1
+    return None
+
+
+def _opus_params(data: bytes) -> Optional[Tuple[int, int]]:
+    """OpusHead 채널 수 (샘플레이트는 48kHz 고정)"""
+    head = data.find(b"OpusHead")
+    if head < 0 or head + 10 > len(data):
+        return None
+    return OPUS_SAMPLE_RATE, data[head + 9]
+
+
+def ffprobe_params(path: str) -> Optional[Tuple[int, int]]:
+    """ffprobe로 (샘플레이트, 채널 수) 측정 (헤더 파싱이 안 되는 형식용)"""
+    try:
+        out = subprocess.check_output([
+            "ffprobe", "-v", "error", "-select_streams", "a:0",
+            "-show_entries", "stream=sample_rate,channels",
+            "-of", "default=nokey=1:noprint_wrappers=1", path,
+        ]).decode().split()
+        return int(out[0]), int(out[1])
+    except (subprocess.CalledProcessError, OSError, ValueError, IndexError):
+        return None
+
+
+def audio_params(path: str) -> Optional[Tuple[int, int]]:
+    """음성 파일의 (샘플레이트, 채널 수). 측정 실패 시 None"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pcm":
+        return PCM_SAMPLE_RATE, PCM_CHANNELS
+
+    try:
+        with open(path, "rb") as f:
+            data = f.read(PARAMS_READ_BYTES)
+    except OSError:
+        return None
+
+    params: Optional[Tuple[int, int]] = None
+    if data[:4] == b"RIFF":
+        params = _wav_params(data)
+    elif data[:4] == b"OggS":
+        params = _opus_params(data)
+    elif ext in (".aac", ".adts"):
+        params = _adts_params(data)
+    elif ext == ".mp3":
+        params = _mp3_params(data)
+
+    return params or ffprobe_params(path)
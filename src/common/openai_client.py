@@ -0,0 +1,250 @@
+"""
+openai_client.py
+- 요약 / 스크립트 / TTS 단계 공용 OpenAI 클라이언트 관리
+- keep-alive 연결 풀을 가진 httpx 클라이언트 1개를 모든 단계가 공유
+- 모델별 토큰 버킷으로 요청 속도 제한: 429 응답이면 속도를 절반으로, 성공하면 조금씩 회복,
+  x-ratelimit-* 헤더가 오면 한도/잔여량에 맞춰 조정
+  (동기 httpx.Client / 비동기 httpx.AsyncClient 모두 같은 버킷을 사용 → invoke / ainvoke / abatch 공통)
+- 재시도는 OpenAI SDK의 지수 backoff + jitter (Retry-After 존중), 호출별 timeout
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from typing import Dict, Optional
+
+import httpx
+from openai import OpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+from langchain_openai import ChatOpenAI
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "32"))
+OPENAI_KEEPALIVE = int(os.getenv("OPENAI_KEEPALIVE", "16"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "4"))
+OPENAI_CONNECT_TIMEOUT = 5.0
+OPENAI_READ_TIMEOUT = float(os.getenv("OPENAI_READ_TIMEOUT", "120"))
+
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))     # 헤더를 받기 전 모델별 초기 분당 요청 수
+MIN_RATE = 0.2                                          # 초당 최소 요청 수
+RECOVER_RATIO = 0.05                                    # 성공 시 한도 대비 회복 비율
+BURST_SECONDS = 2.0                                     # 버킷 용량 = 초당 속도 × BURST_SECONDS
+
+_DURATION_RE = re.compile(r"([\d.]+)(ms|s|m|h)")
+_UNIT_SEC = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset(value: Optional[str]) -> Optional[float]:
+    """x-ratelimit-reset-* 헤더 ("1s", "6m0s", "20ms") → 초"""
+    if not value:
+        return None
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return sum(float(n) * _UNIT_SEC[u] for n, u in parts)
+
+
+# ------------------------------------------------------------
+# 적응형 토큰 버킷
+# ------------------------------------------------------------
+class AdaptiveTokenBucket:
+    """
+    초당 rate개씩 채워지는 토큰 버킷 (AIMD).
+    acquire() / acquire_async()는 토큰이 생길 때까지 대기. 429 → rate 절반 + Retry-After 동안 정지,
+    성공 → max_rate 방향으로 조금씩 증가.
+    """
+
+    def __init__(self, rpm: float = OPENAI_RPM):
+        self.max_rate = rpm / 60.0
+        self.rate = self.max_rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self.rate * BURST_SECONDS)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _take(self) -> float:
+        """토큰 1개를 가져오면 0, 아니면 다시 시도할 때까지의 대기 시간(초)"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self.paused_until and self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0.0
+            return max(self.paused_until - now, (1.0 - self.tokens) / self.rate)
+
+    def acquire(self):
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """이벤트 루프를 막지 않는 acquire (비동기 클라이언트용)"""
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def on_rate_limited(self, retry_after: Optional[float]):
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def on_success(self, headers: httpx.Headers):
+        with self._lock:
+            limit = headers.get("x-ratelimit-limit-requests")
+            if limit:
+                try:
+                    self.max_rate = float(limit) / 60.0
+                except ValueError:
+                    pass
+
+            # 요청/토큰 잔여량이 바닥이면 reset까지 정지
+            for kind in ("requests", "tokens"):
+                remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+                if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+                    reset = parse_reset(headers.get(f"x-ratelimit-reset-{kind}"))
+                    if reset:
+                        self.paused_until = max(self.paused_until, time.monotonic() + reset)
+
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVER_RATIO)
+
+
+_buckets: Dict[str, AdaptiveTokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(model: str) -> AdaptiveTokenBucket:
+    with _buckets_lock:
+        if model not in _buckets:
+            _buckets[model] = AdaptiveTokenBucket()
+        return _buckets[model]
+
+
+# ------------------------------------------------------------
+# httpx 이벤트 훅 (요청 전 대기 / 응답 후 속도 조정)
+# ------------------------------------------------------------
+def _request_model(request: httpx.Request) -> str:
+    """요청 본문(JSON)의 model 필드 (없으면 "default")"""
+    if "json" not in request.headers.get("content-type", ""):
+        return "default"
+    try:
+        return json.loads(request.content).get("model") or "default"
+    except (ValueError, AttributeError, httpx.RequestNotRead):
+        return "default"
+
+
+def _on_request(request: httpx.Request):
+    model = _request_model(request)
+    request.extensions["rate_model"] = model
+    get_bucket(model).acquire()
+
+
+async def _on_request_async(request: httpx.Request):
+    model = _request_model(request)
+    request.extensions["rate_model"] = model
+    await get_bucket(model).acquire_async()
+
+
+def _on_response(response: httpx.Response):
+    model = response.request.extensions.get("rate_model", "default")
+    bucket = get_bucket(model)
+    if response.status_code == 429:
+        retry_after = parse_reset(response.headers.get("retry-after"))
+        bucket.on_rate_limited(retry_after)
+        print(f"[WARN] {model} 요청 제한(429) → 속도 {bucket.rate * 60:.0f} rpm으로 조정")
+    elif response.status_code < 400:
+        bucket.on_success(response.headers)
+
+
+async def _on_response_async(response: httpx.Response):
+    _on_response(response)
+
+
+# ------------------------------------------------------------
+# 공유 클라이언트
+# ------------------------------------------------------------
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+_openai_clients: Dict[Optional[str], OpenAI] = {}
+_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """모든 OpenAI 호출이 공유하는 keep-alive 연결 풀"""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                event_hooks={"request": [_on_request], "response": [_on_response]},
+            )
+        return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    비동기 호출(ainvoke / abatch)용 연결 풀. 속도 제한 버킷은 동기 클라이언트와 공유.
+    httpx.AsyncClient 연결은 생성된 이벤트 루프에 묶이므로 한 루프에서만 사용
+    """
+    global _async_http_client
+    with _lock:
+        if _async_http_client is None:
+            _async_http_client = DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_KEEPALIVE,
+                ),
+                timeout=httpx.Timeout(OPENAI_READ_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+                event_hooks={"request": [_on_request_async], "response": [_on_response_async]},
+            )
+        return _async_http_client
+
+
+def get_openai_client(base_url: Optional[str] = None) -> OpenAI:
+    """공유 연결 풀 / 속도 제한 / 재시도 설정이 적용된 OpenAI 클라이언트"""
+    http_client = get_http_client()
+    with _lock:
+        if base_url not in _openai_clients:
+            _openai_clients[base_url] = OpenAI(
+                base_url=base_url,
+                http_client=http_client,
+                max_retries=OPENAI_MAX_RETRIES,
+            )
+        return _openai_clients[base_url]
+
+
+def get_chat_model(model: str, temperature: float = 0.5) -> ChatOpenAI:
+    """공유 연결 풀 / 속도 제한 / 재시도 설정이 적용된 ChatOpenAI"""
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+        max_retries=OPENAI_MAX_RETRIES,
+        timeout=OPENAI_READ_TIMEOUT,
+    )
@@ -0,0 +1,165 @@
+"""
+audio_chunks.py
+- 스크립트 문장 분할 / 문장 묶음(chunk) 구성
+- 음성 클립 이어붙이기: 클립 사이에 같은 길이의 무음 클립을 넣고 재인코딩 없이 병합
+  (ffmpeg concat demuxer + -c copy, 무음 클립은 첫 클립과 같은 형식/샘플레이트/채널로 1회 생성,
+   pcm은 바이트 연결)
+- node_tts 문장 분할 모드 / speech_stream 공용
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import threading
+from typing import List, Optional
+
+from media_info import PCM_SAMPLE_RATE, PCM_SAMPLE_WIDTH, PCM_CHANNELS, audio_params
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+SENTENCE_MIN_CHARS = 20        # 이보다 짧은 문장은 다음 문장과 합침
+TTS_CHUNK_CHARS = 400          # 문장 분할 모드의 chunk 최대 길이 (문자 수)
+TTS_PAUSE_SEC = 0.25           # 클립 사이 무음 길이 (초)
+
+_SENTENCE_END = re.compile(r"[.!?。…]+[\"')\]]*(?=\s)|\n+")
+
+
+# ------------------------------------------------------------
+# 문장 분할
+# ------------------------------------------------------------
+class SentenceSplitter:
+    """
+    토큰 조각을 받아 완성된 문장을 돌려줌.
+    문장 끝 기호 뒤에 공백이 와야 확정 (소수점 "3.14" 등 오분할 방지)
+    """
+
+    def __init__(self, min_chars: int = SENTENCE_MIN_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        self.buffer += text
+        sentences = []
+        start = 0
+        for m in _SENTENCE_END.finditer(self.buffer):
+            candidate = self.buffer[start:m.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = m.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        rest, self.buffer = self.buffer.strip(), ""
+        return rest or None
+
+
+def split_sentences(text: str, min_chars: int = SENTENCE_MIN_CHARS) -> List[str]:
+    """완성된 텍스트 → 문장 리스트 (SentenceSplitter와 같은 기준)"""
+    splitter = SentenceSplitter(min_chars)
+    sentences = splitter.feed(text)
+    rest = splitter.flush()
+    return sentences + ([rest] if rest else [])
+
+
+def chunk_sentences(text: str, max_chars: int = TTS_CHUNK_CHARS) -> List[str]:
+    """문장을 순서대로 max_chars 이하 묶음으로 (한 문장이 더 길면 단독 chunk)"""
+    chunks, current = [], ""
+    for sentence in split_sentences(text):
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            chunks.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# ------------------------------------------------------------
+# 클립 병합
+# ------------------------------------------------------------
+# 확장자별 (무음 인코더 옵션, 출력 muxer)
+_CLIP_CODECS = {
+    ".mp3": (["-c:a", "libmp3lame", "-q:a", "9"], "mp3"),
+    ".aac": (["-c:a", "aac", "-b:a", "32k"], "adts"),
+    ".opus": (["-c:a", "libopus", "-b:a", "16k"], "ogg"),
+    ".wav": (["-c:a", "pcm_s16le"], "wav"),
+}
+
+
+def silence_clip(ref_clip: str, seconds: float, out_dir: str) -> str:
+    """ref_clip과 같은 형식/샘플레이트/채널의 무음 클립 (이미 있으면 재사용)"""
+    ext = os.path.splitext(ref_clip)[1].lower()
+    params = audio_params(ref_clip)
+    if params is None:
+        raise RuntimeError(f"음성 형식 확인 실패: {ref_clip}")
+    sample_rate, channels = params
+    path = os.path.join(out_dir, f"silence_{sample_rate}_{channels}_{int(seconds * 1000)}ms{ext}")
+    if os.path.exists(path):
+        return path
+
+    codec, muxer = _CLIP_CODECS[ext]
+    # 같은 무음 클립을 여러 슬라이드 스레드가 동시에 만들 수 있음 → 스레드별 임시 파일
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    layout = "mono" if channels == 1 else "stereo"
+    subprocess.check_call([
+        "ffmpeg", "-y", "-v", "error",
+        "-f", "lavfi", "-i", f"anullsrc=r={sample_rate}:cl={layout}",
+        "-t", f"{seconds:.3f}", *codec, "-f", muxer, tmp,
+    ])
+    os.replace(tmp, path)
+    return path
+
+
+def _join_pcm(clips: List[str], out_path: str, pause: float):
+    """헤더 없는 PCM은 바이트 이어붙이기 + 0 바이트 무음 (완전 무손실/무간격)"""
+    gap = bytes(int(pause * PCM_SAMPLE_RATE) * PCM_SAMPLE_WIDTH * PCM_CHANNELS)
+    tmp = f"{out_path}.part"
+    with open(tmp, "wb") as out:
+        for i, c in enumerate(clips):
+            if i > 0:
+                out.write(gap)
+            with open(c, "rb") as f:
+                shutil.copyfileobj(f, out)
+    os.replace(tmp, out_path)
+
+
+def join_audio_clips(clips: List[str], out_path: str, pause: float = TTS_PAUSE_SEC) -> str:
+    """
+    음성 클립들을 순서대로 재인코딩 없이 이어붙이고 클립 파일 삭제.
+    pause > 0 이면 클립 사이에 같은 길이의 무음 삽입
+    (mp3 / aac(ADTS) / opus(Ogg) / wav: ffmpeg concat demuxer + -c copy, pcm: 바이트 연결)
+    """
+    if len(clips) == 1:
+        os.replace(clips[0], out_path)
+        return out_path
+
+    ext = os.path.splitext(out_path)[1].lower()
+    if ext == ".pcm":
+        _join_pcm(clips, out_path, pause)
+    else:
+        gap = silence_clip(clips[0], pause, os.path.dirname(out_path) or ".") if pause > 0 else None
+
+        list_path = out_path + ".txt"
+        with open(list_path, "w", encoding="utf-8") as f:
+            for i, c in enumerate(clips):
+                if gap and i > 0:
+                    f.write(f"file '{os.path.abspath(gap)}'\n")
+                f.write(f"file '{os.path.abspath(c)}'\n")
+
+        tmp = f"{out_path}.part"
+        subprocess.check_call(
+            ["ffmpeg", "-y", "-v", "error", "-safe", "0", "-f", "concat",
+             "-i", list_path, "-c", "copy", "-f", _CLIP_CODECS[ext][1], tmp]
+        )
+        os.replace(tmp, out_path)
+        os.remove(list_path)
+
+    for c in clips:
+        os.remove(c)
+    return out_path
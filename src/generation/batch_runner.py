@@ -0,0 +1,288 @@
+"""
+batch_runner.py
+- 오프라인 일괄 변환용 배치 모드 (state["generation_mode"] = "batch")
+- 요약 / 스크립트 요청을 슬라이드 전체 JSONL 배치 작업으로 제출 → 상태 폴링 → 결과를 SlideData에 반영
+- 분당 요청 제한 대신 배치 용량 기준으로 처리량이 정해짐
+- 제출기(BatchSubmitter)는 교체 가능: OpenAI Batch API (base_url로 로컬 대역 서버 지정 가능) / 로컬 동기 실행
+- TTS(/v1/audio/speech)는 Batch API 대상 엔드포인트가 아니므로 스크립트 배치 완료 후
+  동시 요청 수를 제한해 일반 호출로 처리
+"""
+
+import os
+import json
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage
+from openai import OpenAI
+
+from ppt_parser import SlideData
+from text_generator import LLM_MODEL, build_summary_messages, apply_summary
+from script_generator import build_script_messages, apply_script
+from tts_engine import node_tts
+from llm_cache import LLMCache, get_llm_cache
+from openai_client import get_chat_model, get_openai_client
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+BATCH_SUBMITTER = os.getenv("BATCH_SUBMITTER", "openai")       # openai / local
+BATCH_BASE_URL = os.getenv("BATCH_BASE_URL")                   # 로컬 대역 서버 등 (없으면 기본 API)
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_POLL_INTERVAL = float(os.getenv("BATCH_POLL_INTERVAL", "30"))    # 초
+BATCH_TIMEOUT = float(os.getenv("BATCH_TIMEOUT", str(24 * 3600)))     # 초
+BATCH_TEMPERATURE = 0.5
+
+BATCH_DONE = {"completed", "failed", "expired", "cancelled"}
+
+
+# ------------------------------------------------------------
+# 요청 직렬화
+# ------------------------------------------------------------
+def _to_openai_messages(messages: List[BaseMessage]) -> List[Dict]:
+    """LangChain 메시지 → chat.completions 메시지 형식"""
+    roles = {"human": "user", "ai": "assistant", "system": "system"}
+    return [{"role": roles.get(m.type, m.type), "content": m.content} for m in messages]
+
+
+def batch_line(custom_id: str, messages: List[BaseMessage],
+               model: str = LLM_MODEL, temperature: float = BATCH_TEMPERATURE) -> Dict:
+    """배치 입력 JSONL 한 줄"""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": {
+            "model": model,
+            "temperature": temperature,
+            "messages": _to_openai_messages(messages),
+        },
+    }
+
+
+def parse_result_line(line: Dict) -> Tuple[str, Optional[str], Optional[str]]:
+    """배치 결과 JSONL 한 줄 → (custom_id, 응답 텍스트, 오류 메시지)"""
+    custom_id = line.get("custom_id", "")
+    if line.get("error"):
+        return custom_id, None, str(line["error"])
+    response = line.get("response") or {}
+    if response.get("status_code") != 200:
+        return custom_id, None, f"status {response.get('status_code')}: {response.get('body')}"
+    try:
+        return custom_id, response["body"]["choices"][0]["message"]["content"], None
+    except (KeyError, IndexError, TypeError) as e:
+        return custom_id, None, f"응답 형식 오류: {e}"
+
+
+# ------------------------------------------------------------
+# 제출기
+# ------------------------------------------------------------
+class BatchSubmitter(ABC):
+    """
+    배치 작업 제출 인터페이스.
+    submit(): 입력 JSONL 경로 → 작업 id
+    status(): 작업 id → "validating" / "in_progress" / "completed" / "failed" ...
+    results(): 작업 id → 결과 줄 리스트 (dict)
+    """
+    name = ""
+
+    @abstractmethod
+    def submit(self, jsonl_path: str) -> str:
+        ...
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        ...
+
+    @abstractmethod
+    def results(self, batch_id: str) -> List[Dict]:
+        ...
+
+
+class OpenAIBatchSubmitter(BatchSubmitter):
+    """OpenAI Batch API (base_url 지정 시 같은 API를 흉내 내는 로컬 서버 사용)"""
+    name = "openai"
+
+    def __init__(self, base_url: Optional[str] = BATCH_BASE_URL):
+        self.client = get_openai_client(base_url)
+        self._batches: Dict[str, object] = {}
+
+    def submit(self, jsonl_path: str) -> str:
+        with open(jsonl_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=uploaded.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        batch = self.client.batches.retrieve(batch_id)
+        self._batches[batch_id] = batch
+        return batch.status
+
+    def results(self, batch_id: str) -> List[Dict]:
+        batch = self._batches.get(batch_id) or self.client.batches.retrieve(batch_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            text = self.client.files.content(file_id).text
+            lines.extend(json.loads(l) for l in text.splitlines() if l.strip())
+        return lines
+
+
+class LocalBatchSubmitter(BatchSubmitter):
+    """
+    배치 API 없이 JSONL 요청을 직접 chat.completions로 실행 (개발/검증용).
+    submit() 시점에 동시 요청 수를 제한해 모두 실행하고 결과를 보관.
+    """
+    name = "local"
+
+    def __init__(self, base_url: Optional[str] = BATCH_BASE_URL, concurrency: int = 4):
+        self.client = get_openai_client(base_url)
+        self.concurrency = concurrency
+        self._results: Dict[str, List[Dict]] = {}
+
+    def _run(self, line: Dict) -> Dict:
+        try:
+            completion = self.client.chat.completions.create(**line["body"])
+            return {"custom_id": line["custom_id"],
+                    "response": {"status_code": 200, "body": completion.model_dump()},
+                    "error": None}
+        except Exception as e:
+            return {"custom_id": line["custom_id"], "response": None, "error": {"message": str(e)}}
+
+    def submit(self, jsonl_path: str) -> str:
+        with open(jsonl_path, encoding="utf-8") as f:
+            lines = [json.loads(l) for l in f if l.strip()]
+        with ThreadPoolExecutor(max_workers=self.concurrency) as ex:
+            results = list(ex.map(self._run, lines))
+        batch_id = f"local-{os.path.basename(jsonl_path)}-{len(self._results)}"
+        self._results[batch_id] = results
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed"
+
+    def results(self, batch_id: str) -> List[Dict]:
+        return self._results[batch_id]
+
+
+BATCH_SUBMITTERS = {
+    "openai": OpenAIBatchSubmitter,
+    "local": LocalBatchSubmitter,
+}
+
+
+def get_batch_submitter(state: Optional[dict] = None) -> BatchSubmitter:
+    """state["batch_submitter"] (없으면 BATCH_SUBMITTER 환경변수)로 제출기 선택"""
+    name = (state or {}).get("batch_submitter") or BATCH_SUBMITTER
+    if name not in BATCH_SUBMITTERS:
+        raise ValueError(f"알 수 없는 배치 제출기: {name} (지원: {', '.join(BATCH_SUBMITTERS)})")
+    return BATCH_SUBMITTERS[name]()
+
+
+# ------------------------------------------------------------
+# 배치 실행
+# ------------------------------------------------------------
+def run_batch(requests: Dict[str, List[BaseMessage]], state: dict, stage: str,
+              submitter: BatchSubmitter) -> Dict[str, object]:
+    """
+    custom_id → 메시지 요청 묶음을 배치로 실행.
+    결과: custom_id → 응답 텍스트 또는 예외 (캐시 hit 요청은 제출하지 않음)
+    """
+    cache: Optional[LLMCache] = get_llm_cache(state)
+    key_llm = get_chat_model(LLM_MODEL, temperature=BATCH_TEMPERATURE)   # 캐시 키 (일반 모드와 공유)
+    results: Dict[str, object] = {}
+    pending = {}
+    for custom_id, messages in requests.items():
+        content = cache.get(key_llm, messages) if cache is not None else None
+        if content is None:
+            pending[custom_id] = messages
+        else:
+            results[custom_id] = content
+
+    if not pending:
+        print(f"[INFO] {stage} 배치: 전체 {len(requests)}건 캐시 hit → 제출 생략")
+        return results
+
+    batch_dir = os.path.join(state["work_dir"], "batch")
+    os.makedirs(batch_dir, exist_ok=True)
+    jsonl_path = os.path.join(batch_dir, f"{stage}.jsonl")
+    with open(jsonl_path, "w", encoding="utf-8") as f:
+        for custom_id, messages in pending.items():
+            f.write(json.dumps(batch_line(custom_id, messages), ensure_ascii=False) + "\n")
+
+    batch_id = submitter.submit(jsonl_path)
+    print(f"[INFO] {stage} 배치 제출: {batch_id} ({len(pending)}건)")
+
+    interval = state.get("batch_poll_interval", BATCH_POLL_INTERVAL)
+    deadline = time.time() + BATCH_TIMEOUT
+    status = submitter.status(batch_id)
+    while status not in BATCH_DONE:
+        if time.time() > deadline:
+            raise TimeoutError(f"{stage} 배치 시간 초과: {batch_id}")
+        time.sleep(interval)
+        status = submitter.status(batch_id)
+    print(f"[INFO] {stage} 배치 종료: {batch_id} → {status}")
+
+    for line in submitter.results(batch_id):
+        custom_id, content, error = parse_result_line(line)
+        if custom_id not in pending:
+            continue
+        if error is not None:
+            results[custom_id] = RuntimeError(error)
+            continue
+        results[custom_id] = content
+        if cache is not None:
+            cache.put(key_llm, pending[custom_id], content)
+
+    for custom_id in pending:
+        results.setdefault(custom_id, RuntimeError(f"배치 결과 없음 (status={status})"))
+    return {custom_id: results[custom_id] for custom_id in requests}
+
+
+# ------------------------------------------------------------
+# 노드
+# ------------------------------------------------------------
+def node_batch_generate(state: dict) -> dict:
+    """
+    요약 배치 → 스크립트 배치 → TTS(node_tts) 순서로 실행.
+    실패한 슬라이드는 해당 산출물 없이 남는다.
+    """
+    submitter = get_batch_submitter(state)
+    slides: List[SlideData] = state.get("slides", [])
+    by_id = {f"page-{s.page}": s for s in slides}
+
+    # 1) 요약
+    requests = {}
+    for custom_id, slide in by_id.items():
+        messages = build_summary_messages(slide, state)
+        if messages is not None:
+            requests[custom_id] = messages
+    for custom_id, content in run_batch(requests, state, "summary", submitter).items():
+        if isinstance(content, Exception):
+            print(f"[ERROR] Page {by_id[custom_id].page} 요약 생성 실패: {content}")
+            continue
+        apply_summary(by_id[custom_id], content)
+
+    # 2) 스크립트
+    requests = {}
+    for custom_id, slide in by_id.items():
+        messages = build_script_messages(slide, state)
+        if messages is not None:
+            requests[custom_id] = messages
+    for custom_id, content in run_batch(requests, state, "script", submitter).items():
+        if isinstance(content, Exception):
+            print(f"[ERROR] Page {by_id[custom_id].page} 스크립트 생성 실패: {content}")
+            continue
+        apply_script(by_id[custom_id], content)
+
+    # 3) TTS (Batch API 미지원 엔드포인트 → node_tts의 동시 요청 수 제한 일반 호출)
+    return node_tts(state)
@@ -0,0 +1,152 @@
+"""
+fused_generator.py
+- node_generate_summary_and_script
+- 슬라이드당 구조화 출력 요청 1회로 요약(summary) + 강의 스크립트(script)를 함께 생성
+- node_generate_text → node_generate_script_with_context 2단계 대비
+  LLM 왕복 횟수와 이미지 업로드 용량이 절반
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
+
+from ppt_parser import SlideData
+from text_generator import (
+    LLM_MODEL, LLM_CONCURRENCY, img_to_data_url,
+    is_title_slide, title_slide_text, apply_summary,
+)
+from script_generator import apply_script
+from llm_cache import cached_invoke, cached_batch
+from openai_client import get_chat_model
+from prompt_builder import build_slide_context, record_prompt_tokens
+
+
+# ------------------------------------------------------------
+# 구조화 출력 스키마
+# ------------------------------------------------------------
+class SlideNarration(BaseModel):
+    summary: str = Field(description="슬라이드 내용의 객관적 요약 설명문 (서술형, 불릿 금지)")
+    script: str = Field(description="강의자가 학습자에게 설명하듯 자연스러운 5~8문장 강의 스크립트")
+
+
+FUSED_CACHE_TAG = "fused"
+
+
+# ------------------------------------------------------------
+# 요청 메시지
+# ------------------------------------------------------------
+def build_fused_messages(slide: SlideData, state: dict) -> Optional[List[HumanMessage]]:
+    """
+    슬라이드 1장의 요약 + 스크립트 동시 요청 메시지 생성.
+    제목 슬라이드는 텍스트를 summary로 쓰고, 텍스트도 없으면 None (스크립트 생성 안 함)
+    """
+    # 사용자 프롬프트 불러오기
+    user_prompt_template = state.get("user_prompt_template", "4~6문장으로 요약하고 과장 금지, 불릿 금지")
+    presentation_rule = state.get("presentation_rule", "핵심 내용 중심으로 작성")
+    long_script_rule = state.get("long_script_rule", "한 슬라이드당 4~8 문장으로 자세히 설명")
+    tone = state.get("prompt", {}).get("tone", "차분하고 명확한 강의 톤")
+    style = state.get("prompt", {}).get("style", "학습자가 이해하기 쉽게 설명하는 스타일")
+
+    if is_title_slide(slide):
+        slide.summary = title_slide_text(slide)
+        if not slide.summary:
+            print(f"[SKIP] Page {slide.page}: 내용 없음 → 요약/스크립트 생성 건너뜀")
+            return None
+
+    # 데이터 정리 (토큰 예산 안으로 표/검색 정보 축약)
+    ctx = build_slide_context(slide, state)
+    texts_str = ctx.texts
+    table_str = ctx.tables
+    search_str = ctx.search or "(관련 있는 외부 검색 결과 없음)"
+
+    # 이미지 인코딩 (한 번만 업로드)
+    images_b64 = [url for url in map(img_to_data_url, (slide.image_previews or slide.images)[:3]) if url]
+
+    full_prompt_text = (
+        f"너는 {tone}의 AI 강사야. 설명 스타일은 '{style}'이야.\n"
+        "슬라이드의 주요 텍스트, 표, 첨부된 이미지, 검색정보를 바탕으로 두 가지를 작성해줘.\n\n"
+        f"1) summary — 객관적 요약 설명문. 작성 규칙은 '{presentation_rule}', 요약 규칙: {user_prompt_template}\n"
+        "   - 과장, 감정 표현, 대화체 금지\n"
+        f"2) script — 강의 스크립트. {long_script_rule} 규칙을 따라.\n"
+        "   - 학습자가 처음 듣는다고 가정하고 친절하지만 과장 없는 학습 설명 제공\n"
+        "   - 강의자가 학습자에게 설명하듯 자연스러운 5~8문장\n\n"
+        "공통 규칙:\n"
+        "- 불릿 금지, 문단 서술형으로 작성\n"
+        "- 도입부 멘트(오늘은~, 이번 시간에는~) 금지\n"
+        "- PPT에 없는 정보는 추가로 만들지 않되, 검색 정보가 관련 있을 경우만 반영\n\n"
+        f"▶ 슬라이드 텍스트:\n{texts_str}\n\n"
+        f"▶ 표:\n{table_str}\n\n"
+        f"▶ 외부 검색 정보:\n{search_str}\n"
+    )
+
+    record_prompt_tokens(slide, "fused", full_prompt_text)
+
+    return [
+        HumanMessage(content=[
+            {"type": "text", "text": full_prompt_text},
+            *[
+                {"type": "image_url", "image_url": {"url": img}}
+                for img in images_b64
+            ]
+        ])
+    ]
+
+
+def apply_narration(slide: SlideData, content: str) -> None:
+    """구조화 응답(JSON) → slide.summary / slide.script (제목 슬라이드는 summary 유지)"""
+    narration = SlideNarration.model_validate_json(content)
+    if not is_title_slide(slide):
+        apply_summary(slide, narration.summary)
+    apply_script(slide, narration.script)
+
+
+def structured_llm(llm: ChatOpenAI):
+    """SlideNarration 구조화 출력 (캐시 저장을 위해 원본 응답 포함)"""
+    return llm.with_structured_output(SlideNarration, method="json_schema", include_raw=True)
+
+
+# ------------------------------------------------------------
+# 슬라이드 단위 / 노드
+# ------------------------------------------------------------
+def narrate_slide(slide: SlideData, state: dict, llm: ChatOpenAI) -> None:
+    """슬라이드 1장의 요약 + 스크립트를 한 번의 요청으로 생성"""
+    messages = build_fused_messages(slide, state)
+    if messages is None:
+        return
+    content = cached_invoke(llm, messages, state, runnable=structured_llm(llm), tag=FUSED_CACHE_TAG)
+    apply_narration(slide, content)
+
+
+def node_generate_summary_and_script(state: dict) -> dict:
+    """
+    node_generate_text + node_generate_script_with_context 통합 노드.
+    슬라이드별 요청은 state["llm_concurrency"]만큼 동시에 보내고,
+    실패한 슬라이드는 summary/script 없이 남는다.
+    """
+    llm = get_chat_model(LLM_MODEL, temperature=0.5)
+    concurrency = state.get("llm_concurrency", LLM_CONCURRENCY)
+
+    pending = []
+    for slide in state.get("slides", []):
+        messages = build_fused_messages(slide, state)
+        if messages is not None:
+            pending.append((slide, messages))
+
+    responses = cached_batch(
+        llm, [messages for _, messages in pending], state,
+        max_concurrency=max(1, concurrency),
+        runnable=structured_llm(llm), tag=FUSED_CACHE_TAG,
+    )
+
+    for (slide, _), response in zip(pending, responses):
+        if isinstance(response, Exception):
+            print(f"[ERROR] Page {slide.page} 요약/스크립트 생성 실패: {response}")
+            continue
+        try:
+            apply_narration(slide, response)
+        except ValueError as e:
+            print(f"[ERROR] Page {slide.page} 구조화 응답 해석 실패: {e}")
+
+    return {**state, "slides": state["slides"]}
@@ -0,0 +1,151 @@
+"""
+image_encoder.py
+- LLM 요청용 이미지 인코딩 공용 계층 (요약 / 스크립트 / 통합 노드 공통)
+- 최대 변 길이로 축소 후 JPEG/WebP 재인코딩, 실제 형식에 맞는 MIME 타입 사용
+- 인코딩 결과는 메모리(LRU) + 디스크 캐시에 저장해 단계 간 재사용
+"""
+
+import io
+import os
+import json
+import base64
+import threading
+import mimetypes
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from PIL import Image
+
+from disk_cache import DiskCache, cache_dir, make_key, file_sha256
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+LLM_IMAGE_MAX_SIDE = int(os.getenv("LLM_IMAGE_MAX_SIDE", "1024"))
+LLM_IMAGE_FORMAT = os.getenv("LLM_IMAGE_FORMAT", "jpeg")      # jpeg / webp / original
+LLM_IMAGE_QUALITY = int(os.getenv("LLM_IMAGE_QUALITY", "80"))
+
+IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", cache_dir("image"))
+IMAGE_CACHE_MAX_MB = int(os.getenv("IMAGE_CACHE_MAX_MB", "256"))
+IMAGE_MEMORY_CACHE_MB = 64
+
+_PIL_FORMATS = {"jpeg": "JPEG", "webp": "WEBP"}
+_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png", "GIF": "image/gif"}
+
+
+# ------------------------------------------------------------
+# 인코딩
+# ------------------------------------------------------------
+def _encode(path: str, max_side: int, fmt: str, quality: int) -> Tuple[bytes, str]:
+    """이미지 파일 → (인코딩된 바이트, MIME 타입)"""
+    try:
+        im = Image.open(path)
+    except Exception:
+        # Pillow가 못 여는 형식은 원본 그대로
+        with open(path, "rb") as f:
+            data = f.read()
+        return data, mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+    with im:
+        src_format = im.format
+        target = _PIL_FORMATS.get(fmt, src_format)
+
+        # 이미 목표 형식 + 크기 이하면 원본 바이트 그대로
+        if target == src_format and max(im.size) <= max_side and src_format in _MIME:
+            with open(path, "rb") as f:
+                return f.read(), _MIME[src_format]
+
+        im.thumbnail((max_side, max_side))
+        if target == "JPEG" and im.mode != "RGB":
+            if im.mode in ("RGBA", "LA", "P"):
+                im = im.convert("RGBA")
+                bg = Image.new("RGB", im.size, (255, 255, 255))
+                bg.paste(im, mask=im.split()[-1])
+                im = bg
+            else:
+                im = im.convert("RGB")
+        elif target == "WEBP" and im.mode not in ("RGB", "RGBA"):
+            im = im.convert("RGBA")
+
+        if target not in _MIME:
+            target = "PNG"
+
+        buf = io.BytesIO()
+        save_kwargs = {"quality": quality} if target in ("JPEG", "WEBP") else {}
+        im.save(buf, target, optimize=True, **save_kwargs)
+        return buf.getvalue(), _MIME[target]
+
+
+# ------------------------------------------------------------
+# ImageEncoder (메모리 LRU + 디스크 캐시)
+# ------------------------------------------------------------
+class ImageEncoder:
+    def __init__(self, max_side: int = LLM_IMAGE_MAX_SIDE, fmt: str = LLM_IMAGE_FORMAT,
+                 quality: int = LLM_IMAGE_QUALITY):
+        self.settings = {"max_side": max_side, "format": fmt, "quality": quality}
+        self.disk = DiskCache(IMAGE_CACHE_DIR, max_bytes=IMAGE_CACHE_MAX_MB * 1024 * 1024)
+        self._memory: "OrderedDict[tuple, str]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+    def data_url(self, path: str) -> str:
+        st = os.stat(path)
+        mem_key = (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            if mem_key in self._memory:
+                self._memory.move_to_end(mem_key)
+                return self._memory[mem_key]
+
+        url = self._load_or_encode(path)
+
+        with self._lock:
+            self._memory[mem_key] = url
+            self._memory_bytes += len(url)
+            while self._memory_bytes > IMAGE_MEMORY_CACHE_MB * 1024 * 1024 and len(self._memory) > 1:
+                _, old = self._memory.popitem(last=False)
+                self._memory_bytes -= len(old)
+        return url
+
+    def _load_or_encode(self, path: str) -> str:
+        key = make_key(file_sha256(path), self.settings)
+        entry = self.disk.get(key)
+        if entry is not None:
+            with open(entry / "meta.json", encoding="utf-8") as f:
+                mime = json.load(f)["mime"]
+            with open(entry / "image.bin", "rb") as f:
+                data = f.read()
+        else:
+            data, mime = _encode(path, self.settings["max_side"],
+                                 self.settings["format"], self.settings["quality"])
+
+            def fill(d):
+                with open(d / "image.bin", "wb") as f:
+                    f.write(data)
+                with open(d / "meta.json", "w", encoding="utf-8") as f:
+                    json.dump({"mime": mime}, f)
+            self.disk.put(key, fill)
+
+        return f"data:{mime};base64,{base64.b64encode(data).decode('utf-8')}"
+
+
+_encoder: Optional[ImageEncoder] = None
+_encoder_lock = threading.Lock()
+
+
+def get_image_encoder() -> ImageEncoder:
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None:
+            _encoder = ImageEncoder()
+        return _encoder
+
+
+def encode_image_data_url(path: str) -> str:
+    """이미지 → base64 data URL (축소/재인코딩/캐시 적용). 실패 시 빈 문자열"""
+    try:
+        return get_image_encoder().data_url(path)
+    except Exception as e:
+        print(f"[WARN] 이미지 인코딩 실패 ({path}): {e}")
+        return ""
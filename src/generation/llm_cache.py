@@ -0,0 +1,147 @@
+"""
+llm_cache.py
+- 요약/스크립트 노드 공용 LLM 응답 디스크 캐시
+- 키: 모델명 + temperature + 전체 프롬프트 텍스트 + 첨부 이미지 내용 해시
+- 크기 상한 LRU 제거, state["llm_cache"] = False 또는 LLM_CACHE=0 으로 우회
+"""
+
+import os
+import hashlib
+from typing import List, Optional, Union
+
+from langchain_openai import ChatOpenAI
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable
+
+from disk_cache import DiskCache, cache_dir, make_key
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", cache_dir("llm"))
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "1") != "0"
+
+
+# ------------------------------------------------------------
+# 키 생성
+# ------------------------------------------------------------
+def _message_fingerprint(messages: List[BaseMessage]) -> list:
+    """메시지 → 키용 구조 (이미지는 data URL 대신 내용 해시)"""
+    out = []
+    for msg in messages:
+        content = msg.content
+        if isinstance(content, str):
+            out.append([msg.type, content])
+            continue
+        parts = []
+        for part in content:
+            if isinstance(part, dict) and part.get("type") == "image_url":
+                url = part["image_url"]["url"]
+                parts.append(["image", hashlib.sha256(url.encode("utf-8")).hexdigest()])
+            elif isinstance(part, dict) and part.get("type") == "text":
+                parts.append(["text", part["text"]])
+            else:
+                parts.append(["raw", str(part)])
+        out.append([msg.type, parts])
+    return out
+
+
+class LLMCache:
+    def __init__(self, root: str = LLM_CACHE_DIR, max_mb: int = LLM_CACHE_MAX_MB):
+        self.cache = DiskCache(root, max_bytes=max_mb * 1024 * 1024)
+
+    def key(self, llm: ChatOpenAI, messages: List[BaseMessage], tag: str = "") -> str:
+        return make_key(llm.model_name, llm.temperature, tag, _message_fingerprint(messages))
+
+    def get(self, llm: ChatOpenAI, messages: List[BaseMessage], tag: str = "") -> Optional[str]:
+        value = self.cache.get_json(self.key(llm, messages, tag))
+        return value.get("content") if value else None
+
+    def put(self, llm: ChatOpenAI, messages: List[BaseMessage], content: str, tag: str = ""):
+        self.cache.put_json(self.key(llm, messages, tag), {"content": content})
+
+
+_llm_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache(state: Optional[dict] = None) -> Optional[LLMCache]:
+    """캐시 인스턴스 (우회 설정 시 None)"""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED or not (state or {}).get("llm_cache", True):
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMCache()
+    return _llm_cache
+
+
+# ------------------------------------------------------------
+# 캐시 경유 호출
+# ------------------------------------------------------------
+def _content(response) -> str:
+    """AIMessage 또는 with_structured_output(include_raw=True) 결과 → 응답 텍스트"""
+    if isinstance(response, dict):
+        if response.get("parsing_error"):
+            raise response["parsing_error"]
+        response = response["raw"]
+    return response.content
+
+
+def cached_invoke(llm: ChatOpenAI, messages: List[BaseMessage], state: Optional[dict] = None,
+                  runnable: Optional[Runnable] = None, tag: str = "") -> str:
+    """
+    llm.invoke 결과 텍스트 (캐시 hit 시 호출 생략)
+    runnable: llm을 감싼 호출 대상 (예: 구조화 출력), tag: 캐시 키 구분용
+    """
+    cache = get_llm_cache(state)
+    if cache is not None:
+        content = cache.get(llm, messages, tag)
+        if content is not None:
+            return content
+
+    content = _content((runnable or llm).invoke(messages))
+    if cache is not None:
+        cache.put(llm, messages, content, tag)
+    return content
+
+
+def cached_batch(llm: ChatOpenAI, messages_list: List[List[BaseMessage]],
+                 state: Optional[dict] = None,
+                 max_concurrency: int = 8,
+                 runnable: Optional[Runnable] = None, tag: str = "") -> List[Union[str, Exception]]:
+    """
+    llm.batch 캐시 버전. 캐시에 없는 요청만 동시 호출.
+    결과는 입력 순서 그대로, 실패한 요청은 예외 객체로 반환.
+    """
+    cache = get_llm_cache(state)
+    results: List[Union[str, Exception, None]] = [None] * len(messages_list)
+
+    misses = []
+    for i, messages in enumerate(messages_list):
+        content = cache.get(llm, messages, tag) if cache is not None else None
+        if content is None:
+            misses.append(i)
+        else:
+            results[i] = content
+
+    if misses:
+        responses = (runnable or llm).batch(
+            [messages_list[i] for i in misses],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        for i, response in zip(misses, responses):
+            try:
+                if isinstance(response, Exception):
+                    raise response
+                results[i] = _content(response)
+            except Exception as e:
+                results[i] = e
+                continue
+            if cache is not None:
+                cache.put(llm, messages_list[i], results[i], tag)
+
+    if cache is not None:
+        print(f"[INFO] LLM 캐시: {len(messages_list) - len(misses)}/{len(messages_list)} hit")
+    return results
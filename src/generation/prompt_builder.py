@@ -0,0 +1,261 @@
+"""
+prompt_builder.py
+- 슬라이드 프롬프트용 컨텍스트(텍스트 / 표 / 검색 정보) 구성
+- 토큰 수 추정 후 슬라이드당 예산을 넘으면
+  표: 빈/중복 열 제거 + 구분자 축약 → 열 자르기 → 행 샘플링(앞/뒤 유지) → 셀 잘라내기
+      (예산이 표 개수만큼 최소치를 못 주면 뒤쪽 표는 "(표 N개 생략)")
+  (예산 안의 표는 기존 "a | b" 형식 그대로 → 프롬프트 / LLM 캐시 키 유지)
+  검색: 슬라이드 내용과의 관련도 순으로 잘라냄
+- 요약 / 스크립트 / 통합 노드 공용
+"""
+
+import os
+import re
+import math
+from dataclasses import dataclass
+from typing import List, Optional
+
+try:
+    import tiktoken
+    _ENC = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _ENC = None
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "2000"))   # 슬라이드당 컨텍스트 토큰 예산
+TEXT_BUDGET_RATIO = 0.4         # 슬라이드 텍스트 최대 비율
+TABLE_BUDGET_RATIO = 0.7        # (텍스트 이후 남은 예산 중) 표 최대 비율
+TABLE_MAX_COLS = 8              # 예산 초과 시 유지할 최대 열 수
+TABLE_MIN_TOKENS = 20           # 표 1개에 배분할 최소 예산 (모두 못 주면 뒤쪽 표 생략)
+
+
+# ------------------------------------------------------------
+# 토큰 추정
+# ------------------------------------------------------------
+def estimate_tokens(text: str) -> int:
+    """tiktoken이 있으면 정확히, 없으면 문자 종류별 근사 (영문 ~4자/토큰, 한글 ~1.5자/토큰)"""
+    if not text:
+        return 0
+    if _ENC is not None:
+        return len(_ENC.encode(text))
+    ascii_chars = sum(1 for c in text if ord(c) < 128)
+    return math.ceil(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5)
+
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """예산 안에 들어오도록 뒤쪽을 잘라냄 (생략 표시 " …" 포함)"""
+    if estimate_tokens(text) <= budget:
+        return text
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if estimate_tokens(text[:mid].rstrip() + " …") <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo].rstrip() + " …"
+
+
+# ------------------------------------------------------------
+# 표 직렬화
+# ------------------------------------------------------------
+def _prune_columns(table: List[List[str]]) -> List[List[str]]:
+    """값이 모두 빈 열, 앞 열과 내용이 같은 열 제거"""
+    if not table:
+        return table
+    n_cols = max(len(row) for row in table)
+    rows = [row + [""] * (n_cols - len(row)) for row in table]
+    columns = list(zip(*rows))
+
+    keep, seen = [], set()
+    for idx, col in enumerate(columns):
+        if not any(cell.strip() for cell in col) or col in seen:
+            continue
+        seen.add(col)
+        keep.append(idx)
+    return [[row[i] for i in keep] for row in rows]
+
+
+def _table_text(table: List[List[str]]) -> str:
+    """기본 직렬화 ("a | b | c" 줄 형식)"""
+    return "\n".join(" | ".join(row) for row in table)
+
+
+def _rows_text(rows: List[List[str]]) -> str:
+    """예산 초과 시 축약 직렬화 ("a|b|c")"""
+    return "\n".join("|".join(cell for cell in row) for row in rows)
+
+
+def format_table(table: List[List[str]], budget: Optional[int] = None) -> str:
+    """
+    표 1개를 "a | b | c" 줄 형식으로 직렬화.
+    예산 초과 시에만 빈/중복 열 제거 + 구분자 축약 후 열을 줄이고,
+    첫 행(헤더)과 앞/뒤 행만 남긴다. 헤더만 있는 표는 셀 내용을 잘라 예산에 맞춘다.
+    """
+    text = _table_text(table)
+    if budget is None or estimate_tokens(text) <= budget:
+        return text
+
+    rows = _prune_columns(table)
+    text = _rows_text(rows)
+    if not rows or estimate_tokens(text) <= budget:
+        return text
+
+    header, body = rows[0], rows[1:]
+
+    # 열 자르기 (열이 너무 많은 표)
+    if len(header) > TABLE_MAX_COLS:
+        dropped = len(header) - TABLE_MAX_COLS
+        header = header[:TABLE_MAX_COLS] + [f"(+{dropped}열 생략)"]
+        body = [row[:TABLE_MAX_COLS] for row in body]
+
+    if not body:
+        return truncate_to_tokens(_rows_text([header]), budget)
+
+    # 행 샘플링: 예산에 맞을 때까지 앞/뒤 유지 개수를 줄임
+    keep = len(body)
+    while keep > 0:
+        head_n = (keep + 1) // 2
+        tail_n = keep - head_n
+        sampled = body[:head_n]
+        if keep < len(body):
+            sampled = sampled + [[f"… ({len(body) - keep}행 생략)"]]
+        sampled = sampled + (body[len(body) - tail_n:] if tail_n else [])
+        text = _rows_text([header] + sampled)
+        if estimate_tokens(text) <= budget:
+            return text
+        keep -= max(1, keep // 4)
+
+    return truncate_to_tokens(_rows_text([header, [f"… ({len(body)}행 생략)"]]), budget)
+
+
+def format_tables(tables: List[List[List[str]]], budget: Optional[int] = None) -> str:
+    """
+    여러 표를 [표 n] 블록으로 직렬화.
+    예산 초과 시 표마다 최소 TABLE_MIN_TOKENS를 줄 수 있는 앞쪽 표만 남기고
+    (나머지는 "(표 N개 생략)"), 남은 예산을 표 크기 비율로 나눈다.
+    """
+    if not tables:
+        return ""
+    text = "\n\n".join(f"[표 {idx+1}]\n{_table_text(tbl)}" for idx, tbl in enumerate(tables))
+    if budget is None or estimate_tokens(text) <= budget:
+        return text
+    if budget <= 0:
+        return ""
+
+    # 블록 머리말 / 구분자 / 생략 표시를 뺀 예산이 표마다 최소치를 넘는 개수까지만 유지
+    n = len(tables)
+    while n > 0:
+        omitted = len(tables) - n
+        marker = f"(표 {omitted}개 생략)" if omitted else ""
+        overhead = sum(estimate_tokens(f"[표 {idx+1}]\n") + 1 for idx in range(n)) + estimate_tokens(marker)
+        available = budget - overhead
+        if available >= TABLE_MIN_TOKENS * n:
+            break
+        n -= 1
+
+    if n == 0:
+        return truncate_to_tokens(f"(표 {len(tables)}개 생략)", budget)
+
+    sizes = [max(1, estimate_tokens(_table_text(t))) for t in tables[:n]]
+    total = sum(sizes)
+    spare = available - TABLE_MIN_TOKENS * n
+    blocks = []
+    for idx, (tbl, size) in enumerate(zip(tables, sizes)):
+        tbl_budget = TABLE_MIN_TOKENS + spare * size // total
+        blocks.append(f"[표 {idx+1}]\n{format_table(tbl, tbl_budget)}")
+    if marker:
+        blocks.append(marker)
+
+    # 블록 경계의 토큰 병합 오차까지 예산 안으로
+    return truncate_to_tokens("\n\n".join(blocks), budget)
+
+
+# ------------------------------------------------------------
+# 검색 정보 축약
+# ------------------------------------------------------------
+_WORD_RE = re.compile(r"[0-9a-zA-Z]+|[가-힣]+")
+
+
+def _terms(text: str) -> set:
+    terms = set()
+    for w in _WORD_RE.findall(text.lower()):
+        terms.add(w)
+        if "가" <= w[0] <= "힣" and len(w) > 2:
+            terms.update(w[i:i + 2] for i in range(len(w) - 1))
+    return terms
+
+
+def compact_search(search_str: str, reference: str, budget: int) -> str:
+    """
+    검색 결과(줄 단위)를 슬라이드 내용과 겹치는 단어 비율 순으로 골라 예산 안에 넣음.
+    선택된 줄은 원래 순서 유지.
+    """
+    if not search_str or estimate_tokens(search_str) <= budget:
+        return search_str
+    if budget <= 0:
+        return ""   # 호출부의 "(관련 … 없음)" 표시 사용
+
+    ref = _terms(reference)
+    lines = [l for l in search_str.split("\n") if l.strip()]
+    scored = []
+    for idx, line in enumerate(lines):
+        t = _terms(line)
+        score = len(t & ref) / (len(t) ** 0.5) if t else 0.0
+        scored.append((score, idx, line))
+
+    chosen, used = [], 0
+    for score, idx, line in sorted(scored, key=lambda x: (-x[0], x[1])):
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            truncated = truncate_to_tokens(line, budget)
+            if not chosen and truncated.rstrip(" …"):
+                chosen.append((idx, truncated))
+            continue
+        chosen.append((idx, line))
+        used += cost
+
+    return "\n".join(line for _, line in sorted(chosen))
+
+
+# ------------------------------------------------------------
+# 슬라이드 컨텍스트
+# ------------------------------------------------------------
+@dataclass
+class SlideContext:
+    texts: str          # 슬라이드 텍스트
+    tables: str         # 표 블록
+    search: str         # 검색 정보
+
+
+def build_slide_context(slide, state: dict, reference: Optional[str] = None) -> SlideContext:
+    """
+    슬라이드의 텍스트 / 표 / 검색 정보를 state["prompt_token_budget"] 안으로 구성.
+    reference: 검색 관련도 기준 텍스트 (기본: 슬라이드 텍스트)
+    """
+    budget = state.get("prompt_token_budget", PROMPT_TOKEN_BUDGET)
+
+    texts = truncate_to_tokens(" ".join(slide.texts), int(budget * TEXT_BUDGET_RATIO))
+    remaining = max(0, budget - estimate_tokens(texts))
+
+    search_raw = getattr(slide, "search_result", "") or ""
+    search_need = estimate_tokens(search_raw)
+
+    # 표: 남은 예산 중 최대 TABLE_BUDGET_RATIO, 검색이 적게 쓰면 그만큼 더 사용
+    table_budget = max(remaining - search_need, int(remaining * TABLE_BUDGET_RATIO))
+    tables = format_tables(slide.tables, table_budget)
+    remaining = max(0, remaining - estimate_tokens(tables))
+
+    search = compact_search(search_raw, reference or texts, remaining)
+    return SlideContext(texts=texts, tables=tables, search=search)
+
+
+def record_prompt_tokens(slide, stage: str, prompt_text: str) -> int:
+    """slide.prompt_tokens[stage]에 프롬프트 토큰 수 기록 후 반환"""
+    n = estimate_tokens(prompt_text)
+    slide.prompt_tokens[stage] = n
+    print(f"[INFO] Page {slide.page} {stage} 프롬프트 ≈{n} tokens")
+    return n
@@ -6,12 +6,16 @@ script_generator.py
 """
 
 import re
-from typing import Dict, TypedDict, List
+from typing import Dict, TypedDict, List, Optional
 from dataclasses import dataclass
 
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from ppt_parser import SlideData
+from llm_cache import cached_invoke
+from openai_client import get_chat_model
+from image_encoder import encode_image_data_url
+from prompt_builder import build_slide_context, record_prompt_tokens
 
 
 # ------------------------------------------------------------
@@ -36,6 +40,89 @@ LLM_MODEL = "gpt-4o-mini"
 # ------------------------------------------------------------
 # node_generate_script_with_context 
 # ------------------------------------------------------------
+def build_script_messages(slide: SlideData, state: dict) -> Optional[List[HumanMessage]]:
+    """
+    슬라이드 1장의 요약(summary), 표, 검색 결과, 이미지로 스크립트 요청 메시지 생성.
+    summary가 없으면 None.
+    """
+    # 사용자 프롬프트
+    tone = state.get("prompt", {}).get("tone", "차분하고 명확한 강의 톤")
+    style = state.get("prompt", {}).get("style", "학습자가 이해하기 쉽게 설명하는 스타일")
+    long_script_rule = state.get("long_script_rule", "한 슬라이드당 4~8 문장으로 자세히 설명")
+
+    if not slide.summary:
+        print(f"[SKIP] Page {slide.page}: summary 없음 → 스크립트 생성 건너뜀")
+        return None
+
+    # 기본 summary
+    summary_text = slide.summary
+
+    # 이미지 base64 (요약 단계와 같은 인코딩 캐시 사용)
+    images_b64 = [url for url in map(encode_image_data_url, (slide.image_previews or slide.images)[:3]) if url]
+
+    # 검색 결과 / 표 정리 (토큰 예산 안으로 축약, 검색은 요약 기준 관련도 순)
+    ctx = build_slide_context(slide, state, reference=summary_text)
+    search_str = ctx.search or "(관련 추가 정보 없음)"
+    table_str = ctx.tables
+
+    # prompt 
+    full_prompt_text = (
+        f"너는 {tone}의 AI 강사야.\n"
+        f"설명 스타일은 '{style}'이며, {long_script_rule} 규칙을 따라.\n\n"
+        "- 학습자가 처음 듣는다고 가정하고 친절하지만 과장 없는 학습 설명 제공\n"
+        "- 불릿 금지(문장 서술형)\n"
+        "- 도입부 멘트(오늘은~, 이번 시간에는~) 금지\n"
+        "- PPT에 없는 정보는 추가로 만들지 않되, 검색 정보가 관련 있을 경우만 반영\n\n"
+
+        f"▶ 요약 내용:\n{summary_text}\n\n"
+        f"▶ 외부 검색 정보:\n{search_str}\n\n"
+        f"▶ 표 데이터:\n{table_str}\n\n"
+        "위 내용을 바탕으로 강의자가 학습자에게 설명하듯 자연스러운 5~8문장 스크립트를 작성하라."
+    )
+
+    record_prompt_tokens(slide, "script", full_prompt_text)
+
+    messages = [
+        HumanMessage(content=[
+            {"type": "text", "text": full_prompt_text},
+            *[
+                {"type": "image_url", "image_url": {"url": img}}
+                for img in images_b64
+            ]
+        ])
+    ]
+
+    return messages
+
+
+def strip_intro_phrases(text: str) -> str:
+    """후처리: 강의체 금지 문구(오늘은~, 이번 시간에는~ 등) 문장 제거"""
+    return re.sub(
+        r"(오늘|이번|다음|이 시간|지금|배워보겠|살펴보겠)[^.!?]*[.!?]",
+        "",
+        text.strip()
+    ).strip()
+
+
+def apply_script(slide: SlideData, content: str) -> None:
+    """LLM 응답 후처리 후 slide.script에 저장"""
+    slide.script = strip_intro_phrases(content)
+    print(f"[INFO] Page {slide.page} 스크립트 생성 완료 🎤")
+
+
+def write_script_for_slide(slide: SlideData, state: dict, llm: ChatOpenAI) -> None:
+    """
+    슬라이드 1장의 강의 스크립트를 생성해 slide.script에 저장.
+    (summary가 없으면 건너뜀)
+    """
+    messages = build_script_messages(slide, state)
+    if messages is None:
+        return
+
+    # LLM 호출 (동일 입력은 캐시 재사용)
+    apply_script(slide, cached_invoke(llm, messages, state))
+
+
 def node_generate_script_with_context(state: dict) -> dict:
     """
     슬라이드 요약(summary), 표, 검색 결과, 이미지 등을 기반으로
@@ -45,84 +132,9 @@ def node_generate_script_with_context(state: dict) -> dict:
     형식 규칙: 스크립트 톤, 강의 흐름 등 원본 규칙 동일
     """
 
-    llm = ChatOpenAI(model=LLM_MODEL, temperature=0.5)
-
-    # 사용자 프롬프트
-    tone = state.get("prompt", {}).get("tone", "차분하고 명확한 강의 톤")
-    style = state.get("prompt", {}).get("style", "학습자가 이해하기 쉽게 설명하는 스타일")
-    long_script_rule = state.get("long_script_rule", "한 슬라이드당 4~8 문장으로 자세히 설명")
+    llm = get_chat_model(LLM_MODEL, temperature=0.5)
 
     for slide in state.get("slides", []):
-        if not slide.summary:
-            print(f"[SKIP] Page {slide.page}: summary 없음 → 스크립트 생성 건너뜀")
-            continue
-
-        # 기본 summary
-        summary_text = slide.summary
-
-        # 이미지 base64 
-        def img_to_data_url(path: str):
-            import base64
-            try:
-                with open(path, "rb") as f:
-                    encoded = base64.b64encode(f.read()).decode("utf-8")
-                return f"data:image/png;base64,{encoded}"
-            except:
-                return ""
-
-        images_b64 = [img_to_data_url(img_path) for img_path in slide.images[:3]]
-
-        # 검색 결과
-        search_str = getattr(slide, "search_result", "")
-        if not search_str:
-            search_str = "(관련 추가 정보 없음)"
-
-        # 표 정리
-        table_str = ""
-        if slide.tables:
-            blocks = []
-            for idx, tbl in enumerate(slide.tables):
-                tbl_text = "\n".join([" | ".join(row) for row in tbl])
-                blocks.append(f"[표 {idx+1}]\n{tbl_text}")
-            table_str = "\n\n".join(blocks)
-
-        # prompt 
-        full_prompt_text = (
-            f"너는 {tone}의 AI 강사야.\n"
-            f"설명 스타일은 '{style}'이며, {long_script_rule} 규칙을 따라.\n\n"
-            "- 학습자가 처음 듣는다고 가정하고 친절하지만 과장 없는 학습 설명 제공\n"
-            "- 불릿 금지(문장 서술형)\n"
-            "- 도입부 멘트(오늘은~, 이번 시간에는~) 금지\n"
-            "- PPT에 없는 정보는 추가로 만들지 않되, 검색 정보가 관련 있을 경우만 반영\n\n"
-
-            f"▶ 요약 내용:\n{summary_text}\n\n"
-            f"▶ 외부 검색 정보:\n{search_str}\n\n"
-            f"▶ 표 데이터:\n{table_str}\n\n"
-            "위 내용을 바탕으로 강의자가 학습자에게 설명하듯 자연스러운 5~8문장 스크립트를 작성하라."
-        )
-
-        messages = [
-            HumanMessage(content=[
-                {"type": "text", "text": full_prompt_text},
-                *[
-                    {"type": "image_url", "image_url": {"url": img}}
-                    for img in images_b64
-                ]
-            ])
-        ]
-
-        # LLM 호출
-        response = llm.invoke(messages)
-        script = response.content.strip()
-
-        # 후처리: 강의체 금지 문구 제거
-        script = re.sub(
-            r"(오늘|이번|다음|이 시간|지금|배워보겠|살펴보겠)[^.!?]*[.!?]",
-            "",
-            script
-        ).strip()
-
-        slide.script = script
-        print(f"[INFO] Page {slide.page} 스크립트 생성 완료 🎤")
+        write_script_for_slide(slide, state, llm)
 
     return state
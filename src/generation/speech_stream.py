@@ -0,0 +1,125 @@
+"""
+speech_stream.py
+- 스크립트 LLM 토큰 스트림을 문장 단위로 끊어 바로 TTS 요청
+- 문장 음성 클립({page}_tts_partNNN.<형식>)은 완성되는 대로 media_dir에 생기고,
+  스트림 종료 후 순서대로 이어붙여 {page}_tts.<형식> 생성 (audio_chunks.join_audio_clips)
+- node_generate_script_with_context → node_tts 2단계 대비 첫 음성까지의 시간 단축
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Iterator, List, Tuple
+
+from langchain_openai import ChatOpenAI
+from openai import OpenAI
+
+from ppt_parser import SlideData
+from script_generator import LLM_MODEL, build_script_messages, apply_script, strip_intro_phrases
+from tts_engine import resolve_voice, synthesize_to_file, tts_audio_path
+from llm_cache import get_llm_cache
+from audio_chunks import SentenceSplitter, join_audio_clips, TTS_PAUSE_SEC
+from openai_client import get_chat_model, get_openai_client
+from media_info import media_duration
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+SPEECH_TTS_WORKERS = 4         # 슬라이드당 문장 TTS 동시 요청 수
+SPEECH_SLIDE_WORKERS = 4       # node_generate_script_with_speech 슬라이드 동시 처리 수
+
+
+# ------------------------------------------------------------
+# 슬라이드 단위 스트리밍
+# ------------------------------------------------------------
+def _script_chunks(llm: ChatOpenAI, messages, state: dict, collected: List[str]) -> Iterator[str]:
+    """스크립트 토큰 조각 (캐시 hit 시 저장된 응답 전체를 한 번에)"""
+    cache = get_llm_cache(state)
+    content = cache.get(llm, messages) if cache is not None else None
+    if content is not None:
+        collected.append(content)
+        yield content
+        return
+
+    for chunk in llm.stream(messages):
+        if chunk.content:
+            collected.append(chunk.content)
+            yield chunk.content
+
+    if cache is not None:
+        cache.put(llm, messages, "".join(collected))
+
+
+def stream_script_to_speech(slide: SlideData, state: dict, llm: ChatOpenAI,
+                            client: OpenAI, voice: str,
+                            tts_workers: int = SPEECH_TTS_WORKERS) -> None:
+    """
+    슬라이드 1장의 스크립트를 스트리밍으로 생성하면서 문장별 TTS를 동시에 요청.
+    완료 후 slide.script / slide.audio 기록 (summary가 없으면 건너뜀)
+    """
+    messages = build_script_messages(slide, state)
+    if messages is None:
+        return
+
+    splitter = SentenceSplitter()
+    collected: List[str] = []
+    futures: List[Future] = []
+    t0 = time.time()
+
+    def speak(idx: int, sentence: str) -> Tuple[str, float]:
+        path = tts_audio_path(state, f"{slide.page}_tts_part{idx:03d}")
+        duration, _ = synthesize_to_file(client, sentence, voice, path, state)
+        if idx == 0:
+            print(f"[INFO] Page {slide.page} 첫 음성 클립 준비 ({time.time() - t0:.1f} sec)")
+        return path, duration
+
+    def submit(sentence: str):
+        sentence = strip_intro_phrases(sentence)
+        if sentence:
+            futures.append(ex.submit(speak, len(futures), sentence))
+
+    with ThreadPoolExecutor(max_workers=tts_workers) as ex:
+        for text in _script_chunks(llm, messages, state, collected):
+            for sentence in splitter.feed(text):
+                submit(sentence)
+        rest = splitter.flush()
+        if rest:
+            submit(rest)
+        results = [f.result() for f in futures]
+
+    apply_script(slide, "".join(collected))
+    if not results:
+        print(f"[WARNING] Page {slide.page}: 음성으로 변환할 문장 없음")
+        return
+
+    audio_path = tts_audio_path(state, f"{slide.page}_tts")
+    slide.audio = join_audio_clips([path for path, _ in results], audio_path,
+                                   state.get("tts_pause", TTS_PAUSE_SEC))
+    slide.audio_chunk_durations = [duration for _, duration in results]
+    slide.audio_duration = media_duration(audio_path)
+    print(f"[INFO] Page {slide.page} 스트리밍 음성 완료: {audio_path} "
+          f"(문장 {len(results)}개, {time.time() - t0:.1f} sec)")
+
+
+# ------------------------------------------------------------
+# 노드
+# ------------------------------------------------------------
+def node_generate_script_with_speech(state: dict) -> dict:
+    """
+    node_generate_script_with_context + node_tts 통합 노드 (state["speech_streaming"]).
+    슬라이드별 스크립트 스트림을 문장 단위로 바로 TTS에 넘긴다.
+    """
+    llm = get_chat_model(LLM_MODEL, temperature=0.5)
+    client = get_openai_client()
+    voice = resolve_voice(state)
+
+    slides = state.get("slides", [])
+    with ThreadPoolExecutor(max_workers=SPEECH_SLIDE_WORKERS) as ex:
+        futures = [ex.submit(stream_script_to_speech, s, state, llm, client, voice) for s in slides]
+        for slide, fut in zip(slides, futures):
+            try:
+                fut.result()
+            except Exception as e:
+                print(f"[ERROR] Page {slide.page} 스트리밍 스크립트/음성 생성 실패: {e}")
+
+    return {**state, "slides": state["slides"]}
@@ -1,39 +1,27 @@
 """
 tts_engine.py
-- node_tts / select_voice_by_tone / ffprobe_duration
+- node_tts / select_voice_by_tone
 - 모듈화
+- TTS 음성 캐시: 모델 + voice + 속도/지시문 + 스크립트 해시 → 음성 파일 + 길이
 """
 
 import os
-import subprocess
-from typing import List, Dict, TypedDict
+import json
+import time
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, TypedDict, Optional, Tuple
 from dataclasses import dataclass
 
 from openai import OpenAI
 
 from ppt_parser import SlideData     # 동일한 구조 사용
 from script_generator import State    # 동일한 State 구조 사용
-
-
-# ------------------------------------------------------------
-# ffprobe_duration
-# ------------------------------------------------------------
-def ffprobe_duration(path: str) -> float:
-    """
-    ffprobe로 음성 길이 추출 (초 단위)
-    """
-    cmd = [
-        "ffprobe",
-        "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=nokey=1:noprint_wrappers=1",
-        path
-    ]
-    try:
-        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode().strip()
-        return float(out)
-    except:
-        return 0.0
+from openai_client import get_openai_client
+from disk_cache import DiskCache, cache_dir, make_key
+from media_info import media_duration
+from audio_chunks import chunk_sentences, join_audio_clips, TTS_CHUNK_CHARS, TTS_PAUSE_SEC
 
 
 # ------------------------------------------------------------
@@ -110,14 +98,26 @@ def select_voice_by_tone(tone: str) -> str:
 # node_tts 
 # ------------------------------------------------------------
 TTS_MODEL = "gpt-4o-mini-tts"
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "6"))    # 슬라이드 동시 TTS 요청 수
+TTS_CHUNK_SIZE = 64 * 1024                                  # 응답 스트림 쓰기 단위 (bytes)
+TTS_CHUNK_WORKERS = 4                                       # 문장 분할 모드 슬라이드당 동시 요청 수
 
-def node_tts(state: State) -> State:
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", cache_dir("tts"))
+TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "1024"))
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE", "1") != "0"
+
+_tts_cache: Optional[DiskCache] = None
+
+# 출력 형식 (OpenAI response_format → 확장자)
+TTS_FORMATS = {"mp3": ".mp3", "wav": ".wav", "pcm": ".pcm", "aac": ".aac", "opus": ".opus"}
+TTS_FORMAT = os.getenv("TTS_FORMAT", "mp3")
+
+
+def resolve_voice(state: State) -> str:
     """
-    슬라이드별 스크립트를 TTS로 변환하여 mp3 생성
-    원본 node_tts 그대로 모듈화
+    사용자 지정 voice 우선, 없으면 tone 기반 자동 선택.
+    유효하지 않으면 alloy. 결정된 voice는 state["prompt"]["voice"]에 반영.
     """
-    client = OpenAI()
-
     prompt = state.get("prompt", {})
     tone = prompt.get("tone", "")
     user_voice = prompt.get("voice", None)
@@ -141,32 +141,191 @@ def node_tts(state: State) -> State:
 
     # state에 실제 voice 반영
     state.setdefault("prompt", {})["voice"] = voice
+    return voice
+
+
+def tts_format(state: State) -> str:
+    """state["tts_format"] (없으면 TTS_FORMAT). 지원하지 않는 형식은 mp3"""
+    fmt = state.get("tts_format") or TTS_FORMAT
+    if fmt not in TTS_FORMATS:
+        print(f"[WARN] TTS 출력 형식 '{fmt}' 미지원 → mp3 사용")
+        fmt = "mp3"
+    return fmt
+
+
+def tts_audio_path(state: State, name: str) -> str:
+    """media_dir 아래 TTS 출력 경로 (형식에 맞는 확장자)"""
+    return os.path.join(state["media_dir"], name + TTS_FORMATS[tts_format(state)])
 
-    # 슬라이드별 TTS 생성
-    for slide in state.get("slides", []):
-        script_text = slide.script
-        if not script_text:
-            print(f"[WARNING] Page {slide.page}: 스크립트 없음, 건너뜀")
-            continue
 
-        audio_path = f"{state['media_dir']}/{slide.page}_tts.mp3"
+def tts_params(state: State) -> Dict[str, object]:
+    """TTS 선택 파라미터 (state["tts_speed"], state["tts_instructions"], mp3 이외 출력 형식)"""
+    params = {}
+    fmt = tts_format(state)
+    if fmt != "mp3":
+        params["response_format"] = fmt
+    if state.get("tts_speed"):
+        params["speed"] = state["tts_speed"]
+    if state.get("tts_instructions"):
+        params["instructions"] = state["tts_instructions"]
+    return params
 
-        # TTS 생성 (원본 그대로)
+
+def tts_to_file(client: OpenAI, text: str, voice: str, audio_path: str, **params) -> str:
+    """
+    텍스트 1건을 TTS로 변환해 audio_path에 저장.
+    응답은 TTS_CHUNK_SIZE 단위로 임시 파일에 바로 쓰고 (메모리 버퍼링 없음),
+    완료 후 원자적으로 이름 변경 → 중단돼도 불완전한 파일이 남지 않음
+    """
+    tmp_path = f"{audio_path}.{threading.get_ident()}.part"
+    try:
         with client.audio.speech.with_streaming_response.create(
             model=TTS_MODEL,
             voice=voice,
-            input=script_text
+            input=text,
+            **params
         ) as response:
-            audio_bytes = response.read()
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_bytes(TTS_CHUNK_SIZE):
+                    f.write(chunk)
+        os.replace(tmp_path, audio_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return audio_path
+
 
-        # 저장
-        with open(audio_path, "wb") as f:
-            f.write(audio_bytes)
+# ------------------------------------------------------------
+# TTS 음성 캐시
+# ------------------------------------------------------------
+def get_tts_cache(state: Optional[State] = None) -> Optional[DiskCache]:
+    """캐시 인스턴스 (TTS_CACHE=0 또는 state["tts_cache"] = False 이면 None)"""
+    global _tts_cache
+    if not TTS_CACHE_ENABLED or not (state or {}).get("tts_cache", True):
+        return None
+    if _tts_cache is None:
+        _tts_cache = DiskCache(TTS_CACHE_DIR, max_bytes=TTS_CACHE_MAX_MB * 1024 * 1024)
+    return _tts_cache
+
+
+def tts_cache_key(text: str, voice: str, params: Dict[str, object]) -> str:
+    return make_key(TTS_MODEL, voice, params, text)
+
+
+def synthesize_to_file(client: OpenAI, text: str, voice: str, audio_path: str,
+                       state: State) -> Tuple[float, bool]:
+    """
+    캐시 경유 TTS. (음성 길이(초), 캐시 hit 여부) 반환.
+    hit이면 API 호출 없이 저장된 음성을 audio_path로 복사
+    """
+    params = tts_params(state)
+    cached_name = "audio" + os.path.splitext(audio_path)[1]
+    cache = get_tts_cache(state)
+    key = tts_cache_key(text, voice, params) if cache is not None else None
+
+    if cache is not None:
+        entry = cache.get(key)
+        if entry is not None:
+            with open(entry / "meta.json", encoding="utf-8") as f:
+                duration = json.load(f)["duration"]
+            shutil.copy2(entry / cached_name, audio_path)
+            return duration, True
+
+    tts_to_file(client, text, voice, audio_path, **params)
+    duration = media_duration(audio_path)
+
+    if cache is not None:
+        def fill(d):
+            shutil.copy2(audio_path, d / cached_name)
+            with open(d / "meta.json", "w", encoding="utf-8") as f:
+                json.dump({"duration": duration, "voice": voice, "model": TTS_MODEL}, f)
+        cache.put(key, fill)
+    return duration, False
+
+
+def synthesize_chunks(slide: SlideData, state: State, client: OpenAI, voice: str,
+                      audio_path: str) -> Tuple[float, int]:
+    """
+    문장 분할 모드: 스크립트를 문장 묶음으로 나눠 동시에 TTS 후 무음 간격을 두고 병합.
+    chunk별 길이는 slide.audio_chunk_durations에 기록. (전체 길이, 캐시 hit 수) 반환
+    """
+    chunks = chunk_sentences(slide.script, state.get("tts_chunk_chars", TTS_CHUNK_CHARS))
+    pause = state.get("tts_pause", TTS_PAUSE_SEC)
+    base, ext = os.path.splitext(audio_path)
+
+    def run(idx_text):
+        idx, text = idx_text
+        path = f"{base}_part{idx:03d}{ext}"
+        duration, hit = synthesize_to_file(client, text, voice, path, state)
+        return path, duration, hit
+
+    with ThreadPoolExecutor(max_workers=TTS_CHUNK_WORKERS) as ex:
+        results = list(ex.map(run, enumerate(chunks)))
 
-        duration = ffprobe_duration(audio_path)
-        print(f"[INFO] Page {slide.page} 음성 생성 완료: {audio_path} ({duration:.2f} sec)")
+    join_audio_clips([path for path, _, _ in results], audio_path, pause)
+    slide.audio_chunk_durations = [duration for _, duration, _ in results]
+    return media_duration(audio_path), sum(1 for _, _, hit in results if hit)
 
-        slide.audio = audio_path
+
+def synthesize_slide(slide: SlideData, state: State, client: OpenAI, voice: str) -> None:
+    """
+    슬라이드 1장의 스크립트를 TTS로 변환해 저장 (state["tts_format"], 기본 mp3), slide.audio에 경로 기록.
+    state["tts_chunking"] = True 이면 문장 묶음 단위 동시 합성.
+    소요 시간은 slide.timings["tts"]에 기록
+    """
+    script_text = slide.script
+    if not script_text:
+        print(f"[WARNING] Page {slide.page}: 스크립트 없음, 건너뜀")
+        return
+
+    audio_path = tts_audio_path(state, f"{slide.page}_tts")
+
+    # TTS 생성 + 저장 (동일 스크립트/voice는 캐시 재사용)
+    t0 = time.time()
+    if state.get("tts_chunking"):
+        duration, hits = synthesize_chunks(slide, state, client, voice, audio_path)
+        note = f"chunk {len(slide.audio_chunk_durations)}개, 캐시 {hits}"
+    else:
+        duration, hit = synthesize_to_file(client, script_text, voice, audio_path, state)
+        slide.audio_chunk_durations = [duration]
+        note = "캐시" if hit else ""
+    slide.timings["tts"] = time.time() - t0
+
+    print(f"[INFO] Page {slide.page} 음성 생성 완료{f' ({note})' if note else ''}: {audio_path} "
+          f"({duration:.2f} sec, 소요 {slide.timings['tts']:.1f} sec)")
+
+    slide.audio = audio_path
+    slide.audio_duration = duration
+
+
+def node_tts(state: State) -> State:
+    """
+    슬라이드별 스크립트를 TTS로 변환하여 음성 파일 생성.
+    state["tts_concurrency"]개 슬라이드를 동시에 요청하고,
+    실패한 슬라이드는 audio 없이 남는다.
+    """
+    client = get_openai_client()
+    voice = resolve_voice(state)
+    concurrency = max(1, state.get("tts_concurrency", TTS_CONCURRENCY))
+    slides = state.get("slides", [])
+
+    def run(slide: SlideData):
+        try:
+            synthesize_slide(slide, state, client, voice)
+        except Exception as e:
+            print(f"[ERROR] Page {slide.page} 음성 생성 실패: {e}")
+
+    # 슬라이드별 TTS 생성 (동시 요청 수 제한)
+    t0 = time.time()
+    with ThreadPoolExecutor(max_workers=concurrency) as ex:
+        list(ex.map(run, slides))
+
+    total = sum(s.timings.get("tts", 0.0) for s in slides)
+    cache = get_tts_cache(state)
+    if cache is not None:
+        stats = cache.stats()
+        print(f"[INFO] TTS 캐시: {stats['hits']} hit / {stats['misses']} miss")
+    print(f"[INFO] TTS 완료: 전체 {time.time() - t0:.1f} sec (슬라이드 합계 {total:.1f} sec, 동시 {concurrency})")
 
     return {
         **state,
@@ -2,17 +2,64 @@
 agent_graph.py
 - AI 강사 Agent v2.0 전체 파이프라인 그래프 정의
 - StateGraph 구성
+- run_streaming: 파싱과 후속 단계를 슬라이드 단위로 겹쳐 실행
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from langgraph.graph import StateGraph, START, END
 
-from ppt_parser import State, node_parse_ppt
-from tool_search import node_tool_search
-from text_generator import node_generate_text
-from script_generator import node_generate_script_with_context
-from tts_engine import node_tts
-from video_maker import node_make_video
+from ppt_parser import State, SlideData, node_parse_ppt, iter_parse_ppt
+from tool_search import node_tool_search, search_slides, get_search_backend
+from text_generator import node_generate_text, summarize_slide, LLM_MODEL
+from script_generator import node_generate_script_with_context, write_script_for_slide
+from fused_generator import node_generate_summary_and_script, narrate_slide
+from batch_runner import node_batch_generate
+from speech_stream import node_generate_script_with_speech, stream_script_to_speech
+from tts_engine import node_tts, resolve_voice, synthesize_slide
+from video_maker import node_make_video, make_slide_video, render_plan
 from concat_video import node_concat
+from lecture_render import node_render_lecture
+from hls_output import start_hls, publish_slide, finish_hls
+from openai_client import get_chat_model, get_openai_client
+
+
+# ------------------------------------------------------------
+# 생성 토폴로지 선택
+# ------------------------------------------------------------
+def route_generation(state: State) -> str:
+    """
+    state["generation_mode"]
+    - "two_stage" (기본): 요약 → 스크립트 2단계
+    - "fused": 슬라이드당 1회 요청으로 요약 + 스크립트
+    - "batch": 요약 / 스크립트를 배치 작업으로 제출 후 TTS까지 처리 (오프라인 일괄 변환)
+    """
+    if state.get("generation_mode") == "fused":
+        return "generate_fused"
+    if state.get("generation_mode") == "batch":
+        return "generate_batch"
+    return "generate_page"
+
+
+def route_script(state: State) -> str:
+    """
+    state["speech_streaming"] = True 이면 스크립트 토큰 스트림을
+    문장 단위로 바로 TTS에 넘기는 통합 노드 사용
+    """
+    if state.get("speech_streaming"):
+        return "generate_script_tts"
+    return "generate_script"
+
+
+def route_render(state: State) -> str:
+    """
+    state["render_mode"]
+    - "per_slide" (기본): 슬라이드별 MP4 → concat
+    - "single_pass": 이미지 목록 + 이어붙인 음성으로 최종 영상 1회 인코딩
+    """
+    if state.get("render_mode") == "single_pass":
+        return "render_lecture"
+    return "make_video"
 
 
 # ------------------------------------------------------------
@@ -26,19 +73,104 @@ builder.add_node("parse_ppt", node_parse_ppt)
 builder.add_node("tool_search", node_tool_search)
 builder.add_node("generate_page", node_generate_text)
 builder.add_node("generate_script", node_generate_script_with_context)
+builder.add_node("generate_fused", node_generate_summary_and_script)
+builder.add_node("generate_script_tts", node_generate_script_with_speech)
+builder.add_node("generate_batch", node_batch_generate)
 builder.add_node("tts_mp3", node_tts)
 builder.add_node("make_video", node_make_video)
 builder.add_node("concat", node_concat)
+builder.add_node("render_lecture", node_render_lecture)
 
 # 연결
 builder.add_edge(START, "parse_ppt")
 builder.add_edge("parse_ppt", "tool_search")
-builder.add_edge("tool_search", "generate_page")
-builder.add_edge("generate_page", "generate_script")
+builder.add_conditional_edges("tool_search", route_generation, ["generate_page", "generate_fused", "generate_batch"])
+builder.add_conditional_edges("generate_page", route_script, ["generate_script", "generate_script_tts"])
 builder.add_edge("generate_script", "tts_mp3")
-builder.add_edge("tts_mp3", "make_video")
+builder.add_edge("generate_fused", "tts_mp3")
+builder.add_conditional_edges("generate_script_tts", route_render, ["make_video", "render_lecture"])
+builder.add_conditional_edges("generate_batch", route_render, ["make_video", "render_lecture"])
+builder.add_conditional_edges("tts_mp3", route_render, ["make_video", "render_lecture"])
 builder.add_edge("make_video", "concat")
 builder.add_edge("concat", END)
+builder.add_edge("render_lecture", END)
 
 # 최종 앱
 app = builder.compile()
+
+
+# ------------------------------------------------------------
+# 스트리밍 실행
+# ------------------------------------------------------------
+STREAM_WORKERS = 4
+
+
+def run_streaming(state: State, workers: int = STREAM_WORKERS) -> State:
+    """
+    iter_parse_ppt가 슬라이드를 yield하는 즉시
+    검색 → 요약 → 스크립트 → TTS → 영상 단계를 워커 스레드에서 실행.
+    LibreOffice가 뒤쪽 페이지를 렌더링하는 동안 앞 슬라이드가 먼저 완성된다.
+    마지막에 전체 영상을 병합 (render_mode = "single_pass"이면 영상 단계 없이 최종 1회 인코딩).
+    state["hls_output"]이면 완성된 슬라이드부터 HLS 플레이리스트에 추가되어 처리 중에도 재생 가능.
+    """
+    state = node_tool_search(state)
+
+    llm = get_chat_model(LLM_MODEL, temperature=0.5)
+    client = get_openai_client()
+    voice = resolve_voice(state)
+    backend = get_search_backend(state)
+    use_search = backend.available()
+    _, video_threads = render_plan(state, workers)   # 워커 수만큼 ffmpeg가 겹쳐도 코어 수 이내
+
+    fused = state.get("generation_mode") == "fused"
+    speech_streaming = state.get("speech_streaming") and not fused
+    single_pass = state.get("render_mode") == "single_pass"
+
+    def process(slide: SlideData) -> SlideData:
+        try:
+            if use_search:
+                search_slides([slide], backend)
+            if fused:
+                narrate_slide(slide, state, llm)
+            elif speech_streaming:
+                summarize_slide(slide, state, llm)
+                stream_script_to_speech(slide, state, llm, client, voice)
+            else:
+                summarize_slide(slide, state, llm)
+                write_script_for_slide(slide, state, llm)
+            if not speech_streaming:
+                synthesize_slide(slide, state, client, voice)
+            if not single_pass:
+                make_slide_video(slide, state, video_threads)
+        finally:
+            # 실패한 슬라이드도 알려야 HLS 플레이리스트가 뒤 슬라이드를 공개
+            if not single_pass:
+                publish_slide(slide, state)
+        return slide
+
+    slides = []
+    futures = []
+    if not single_pass:
+        start_hls(state)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            for slide in iter_parse_ppt(state):
+                slides.append(slide)
+                futures.append(ex.submit(process, slide))
+            # 슬라이드별 실패는 격리 (해당 슬라이드만 영상 없이 남음)
+            for slide, fut in zip(slides, futures):
+                try:
+                    fut.result()
+                except Exception as e:
+                    print(f"[ERROR] Page {slide.page} 슬라이드 처리 실패: {e}")
+    finally:
+        # 파싱 중 예외가 나도 플레이리스트를 닫아 다음 실행에 남기지 않음
+        hls_path = finish_hls(state)
+
+    state["slides"] = slides
+    print(f"[INFO] 총 {len(slides)}개 슬라이드 스트리밍 처리 완료.")
+    if single_pass:
+        return node_render_lecture(state)
+    if hls_path:
+        state["hls_playlist_path"] = hls_path
+    return node_concat(state)
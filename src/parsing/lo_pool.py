@@ -0,0 +1,257 @@
+"""
+lo_pool.py
+- 상주형(headless) LibreOffice 워커 풀
+- 워커마다 전용 프로필 디렉토리 사용 → 동시 작업 간 프로필 충돌 방지
+- UNO(python3-uno) 사용 가능 시: 미리 띄워둔 listener에 변환 요청 (cold start 제거)
+- UNO 미설치 시: 워커 전용 프로필로 soffice --convert-to 실행 (충돌만 방지, 시간 초과 시 강제 종료)
+- listener 포트: LO_BASE_PORT 미지정 시 빈 포트 자동 선택
+"""
+
+import os
+import time
+import queue
+import atexit
+import signal
+import socket
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from typing import Optional, List
+
+try:
+    import uno
+    from com.sun.star.beans import PropertyValue
+    HAS_UNO = True
+except ImportError:
+    uno = None
+    PropertyValue = None
+    HAS_UNO = False
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+LO_POOL_SIZE = int(os.getenv("LO_POOL_SIZE", "2"))
+LO_BASE_PORT = int(os.getenv("LO_BASE_PORT", "0"))   # 0: 빈 포트 자동 선택 (앱 여러 개 동시 실행 대비)
+LO_START_TIMEOUT = 30.0      # listener 기동 대기 (초)
+LO_CONVERT_TIMEOUT = 300.0   # CLI 변환 제한 시간 (초)
+
+
+def _free_port() -> int:
+    """OS가 배정한 127.0.0.1 빈 포트"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _lo_env() -> dict:
+    env = os.environ.copy()
+    env.update({"LANG": "ko_KR.UTF-8", "LC_ALL": "ko_KR.UTF-8"})
+    return env
+
+
+# ------------------------------------------------------------
+# LibreOfficeWorker
+# ------------------------------------------------------------
+class LibreOfficeWorker:
+    """
+    전용 프로필을 가진 LibreOffice 워커 1개.
+    UNO가 있으면 listener 프로세스를 상주시켜 변환 요청을 받는다.
+    """
+
+    def __init__(self, worker_id: int, base_dir: Path, port: int):
+        self.worker_id = worker_id
+        self.port = port
+        self.profile_dir = base_dir / f"lo_profile_{worker_id}"
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.proc: Optional[subprocess.Popen] = None
+        self._desktop = None
+
+    @property
+    def profile_url(self) -> str:
+        return self.profile_dir.resolve().as_uri()
+
+    # ---------------- listener 관리 ----------------
+    def start(self):
+        if not HAS_UNO or self.alive():
+            return
+        self.proc = subprocess.Popen(
+            [
+                "soffice", "--headless", "--invisible",
+                "--nologo", "--norestore", "--nodefault",
+                f"-env:UserInstallation={self.profile_url}",
+                f"--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext",
+            ],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=_lo_env()
+        )
+        self._desktop = None
+
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None
+
+    def stop(self):
+        if self._desktop is not None:
+            try:
+                self._desktop.terminate()
+            except Exception:
+                pass
+            self._desktop = None
+        if self.alive():
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
+
+    def _connect(self):
+        if self._desktop is not None:
+            return self._desktop
+
+        local_ctx = uno.getComponentContext()
+        resolver = local_ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_ctx
+        )
+        url = f"uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext"
+
+        deadline = time.monotonic() + LO_START_TIMEOUT
+        while True:
+            try:
+                ctx = resolver.resolve(url)
+                break
+            except Exception:
+                if time.monotonic() > deadline or not self.alive():
+                    raise RuntimeError(f"LibreOffice listener 연결 실패 (port {self.port})")
+                time.sleep(0.3)
+
+        self._desktop = ctx.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", ctx
+        )
+        return self._desktop
+
+    # ---------------- 변환 ----------------
+    def convert(self, src: Path, out_dir: Path, convert_to: str) -> Path:
+        """
+        convert_to: soffice --convert-to 인자와 동일한 형식 (예: "pdf:impress_pdf_Export")
+        """
+        ext, _, filter_name = convert_to.partition(":")
+        out_path = out_dir / f"{src.stem}.{ext}"
+
+        if HAS_UNO:
+            try:
+                return self._convert_uno(src, out_path, filter_name)
+            except Exception as e:
+                print(f"[WARN] LibreOffice worker {self.worker_id} UNO 변환 실패 → 재시작: {e}")
+                self.stop()
+
+        return self._convert_cli(src, out_dir, convert_to, out_path)
+
+    def _convert_uno(self, src: Path, out_path: Path, filter_name: str) -> Path:
+        self.start()
+        desktop = self._connect()
+
+        def prop(name, value):
+            p = PropertyValue()
+            p.Name, p.Value = name, value
+            return p
+
+        doc = desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(src)), "_blank", 0, (prop("Hidden", True),)
+        )
+        try:
+            args = (prop("FilterName", filter_name),) if filter_name else ()
+            doc.storeToURL(uno.systemPathToFileUrl(str(out_path)), args)
+        finally:
+            doc.close(True)
+        return out_path
+
+    def _convert_cli(self, src: Path, out_dir: Path, convert_to: str, out_path: Path) -> Path:
+        """
+        워커 프로필로 soffice --convert-to 실행.
+        제한 시간 초과 시 프로세스 그룹(soffice.bin 포함)을 종료하고 프로필 잠금을 정리한 뒤 RuntimeError
+        """
+        proc = subprocess.Popen(
+            [
+                "soffice", "--headless",
+                f"-env:UserInstallation={self.profile_url}",
+                "--convert-to", convert_to,
+                "--outdir", str(out_dir),
+                str(src),
+            ],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=_lo_env(),
+            start_new_session=True,
+        )
+        try:
+            proc.wait(timeout=LO_CONVERT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(proc.pid, signal.SIGKILL)
+            except OSError:
+                proc.kill()
+            proc.wait()
+            lock = self.profile_dir / ".lock"
+            if lock.exists():
+                lock.unlink()
+            raise RuntimeError(
+                f"LibreOffice 변환 시간 초과 ({LO_CONVERT_TIMEOUT:.0f}s, worker {self.worker_id}): {src}"
+            )
+        return out_path
+
+
+# ------------------------------------------------------------
+# LibreOfficePool
+# ------------------------------------------------------------
+class LibreOfficePool:
+    """
+    LibreOfficeWorker 묶음. 유휴 워커를 하나 빌려 변환하고 반납한다.
+    """
+
+    def __init__(self, size: int = LO_POOL_SIZE, base_dir: Optional[str] = None,
+                 base_port: int = LO_BASE_PORT):
+        """base_port가 0이면 워커마다 빈 포트를 자동 선택"""
+        root = Path(base_dir or tempfile.mkdtemp(prefix="lo_pool_"))
+        self.workers: List[LibreOfficeWorker] = [
+            LibreOfficeWorker(i, root, base_port + i if base_port else _free_port())
+            for i in range(max(1, size))
+        ]
+        self._idle: "queue.Queue[LibreOfficeWorker]" = queue.Queue()
+        for w in self.workers:
+            self._idle.put(w)
+
+    def warm_up(self):
+        """listener를 미리 띄워 첫 변환의 cold start를 없앤다 (UNO 사용 시)"""
+        for w in self.workers:
+            w.start()
+
+    def convert(self, src: str, out_dir: str, convert_to: str = "pdf:impress_pdf_Export") -> Path:
+        src_path = Path(src).expanduser().resolve()
+        out_path = Path(out_dir).expanduser().resolve()
+        out_path.mkdir(parents=True, exist_ok=True)
+
+        worker = self._idle.get()
+        try:
+            return worker.convert(src_path, out_path, convert_to)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for w in self.workers:
+            w.stop()
+
+
+# ------------------------------------------------------------
+# 프로세스 전역 풀
+# ------------------------------------------------------------
+_pool: Optional[LibreOfficePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_lo_pool() -> LibreOfficePool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = LibreOfficePool()
+            _pool.warm_up()
+            atexit.register(_pool.close)
+        return _pool
@@ -0,0 +1,137 @@
+"""
+parse_cache.py
+- node_parse_ppt 결과 캐시
+- 키: PPTX 내용 해시 + 래스터화 설정(dpi) + 축소 이미지 설정(최대 변 길이, JPEG 품질)
+- 저장: SlideData의 파싱 단계 필드(PARSE_FIELDS)만 JSON + 추출 이미지 + 슬라이드 PNG
+  (요약/스크립트/음성 등 후속 단계 결과는 저장하지 않음)
+- 캐시 hit 시 python-pptx / LibreOffice 단계를 완전히 건너뜀
+"""
+
+import os
+import copy
+import json
+import shutil
+from pathlib import Path
+from typing import List, Dict, Optional, Any
+
+from disk_cache import DiskCache, cache_dir, make_key, file_sha256
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", cache_dir("parse"))
+PARSE_CACHE_MAX_MB = int(os.getenv("PARSE_CACHE_MAX_MB", "2048"))
+PARSE_CACHE_VERSION = 3   # 파싱 결과 형식이 바뀌면 올림
+
+# 캐시에 저장하는 SlideData 필드 (파싱 단계에서 채워지는 것만)
+PARSE_FIELDS = ("page", "slide_image", "texts", "images", "tables", "image_previews")
+
+# SlideData 파일 필드 → 복원 위치(state 키)
+FILE_FIELDS = {
+    "slide_image": "work_dir",
+    "images": "media_dir",
+    "image_previews": "media_dir",
+}
+
+
+# ------------------------------------------------------------
+# ParseCache
+# ------------------------------------------------------------
+def parse_record(slide: Any) -> Dict[str, Any]:
+    """
+    SlideData의 파싱 단계 필드 스냅샷 (깊은 복사).
+    슬라이드를 후속 단계로 넘기기 전에 떠 두면 다른 스레드가 채우는 값과 섞이지 않는다
+    """
+    return {name: copy.deepcopy(getattr(slide, name)) for name in PARSE_FIELDS}
+
+
+class ParseCache:
+    def __init__(self, root: str = PARSE_CACHE_DIR, max_mb: int = PARSE_CACHE_MAX_MB):
+        self.cache = DiskCache(root, max_bytes=max_mb * 1024 * 1024)
+
+    def key(self, pptx_path: str, raster_settings: Dict[str, Any]) -> str:
+        return make_key(PARSE_CACHE_VERSION, file_sha256(pptx_path), raster_settings)
+
+    def load(self, state: dict, raster_settings: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        캐시 hit 시 파일을 state의 work_dir/media_dir로 복원하고
+        경로가 갱신된 SlideData dict 목록 반환. miss면 None.
+        """
+        entry = self.cache.get(self.key(state["pptx_path"], raster_settings))
+        if entry is None:
+            return None
+
+        with open(entry / "slides.json", encoding="utf-8") as f:
+            slides = json.load(f)
+
+        files_dir = entry / "files"
+        for slide in slides:
+            for field, dir_key in FILE_FIELDS.items():
+                out_dir = Path(state[dir_key])
+                out_dir.mkdir(parents=True, exist_ok=True)
+                slide[field] = _map_paths(
+                    slide.get(field),
+                    lambda name: _restore(files_dir / name, out_dir / name),
+                )
+        return slides
+
+    def store(self, state: dict, raster_settings: Dict[str, Any], records: List[Dict[str, Any]]):
+        """파싱 결과(parse_record 목록)와 참조 파일들을 캐시에 저장"""
+        key = self.key(state["pptx_path"], raster_settings)
+
+        def fill(entry: Path):
+            files_dir = entry / "files"
+            files_dir.mkdir()
+            saved = []
+            for record in records:
+                record = {name: record[name] for name in PARSE_FIELDS}
+                for field in FILE_FIELDS:
+                    record[field] = _map_paths(
+                        record.get(field),
+                        lambda path: _save(path, files_dir),
+                    )
+                saved.append(record)
+            with open(entry / "slides.json", "w", encoding="utf-8") as f:
+                json.dump(saved, f, ensure_ascii=False)
+
+        self.cache.put(key, fill)
+
+    def stats(self) -> Dict[str, int]:
+        return self.cache.stats()
+
+
+# ------------------------------------------------------------
+# 내부 유틸
+# ------------------------------------------------------------
+def _map_paths(value, fn):
+    """문자열 경로 또는 경로 리스트에 fn 적용 (빈 값은 그대로)"""
+    if not value:
+        return value
+    if isinstance(value, list):
+        return [fn(v) for v in value]
+    return fn(value)
+
+
+def _save(path: str, files_dir: Path) -> str:
+    """파일을 캐시 엔트리에 저장하고 엔트리 내 파일명 반환"""
+    name = os.path.basename(path)
+    if os.path.exists(path):
+        shutil.copy2(path, files_dir / name)
+    return name
+
+
+def _restore(src: Path, dst: Path) -> str:
+    if src.exists():
+        shutil.copy2(src, dst)
+    return str(dst)
+
+
+_parse_cache: Optional[ParseCache] = None
+
+
+def get_parse_cache() -> ParseCache:
+    global _parse_cache
+    if _parse_cache is None:
+        _parse_cache = ParseCache()
+    return _parse_cache
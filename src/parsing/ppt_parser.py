@@ -1,20 +1,26 @@
 """
 ppt_parser.py
 - PPTX에서 텍스트 / 이미지 / 표 추출
-- 슬라이드 PNG 스냅샷 생성
+- 슬라이드 PNG 스냅샷 생성 (LibreOffice 워커 풀 + 병렬 pdftoppm)
 - SlideData 및 State
 """
 
 import os
 import re
+import hashlib
 import subprocess
 from pathlib import Path
-from typing import List, Dict, Optional, TypedDict
-from dataclasses import dataclass
+from typing import List, Dict, Optional, TypedDict, Iterator, Tuple
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
 
+from PIL import Image
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 
+from lo_pool import get_lo_pool
+from parse_cache import get_parse_cache, parse_record
+
 
 # ------------------------------------------------------------
 # SlideData / State 정의 
@@ -31,7 +37,13 @@ class SlideData:
     script: Optional[str] = None       # 강의 스크립트
     script_file: Optional[str] = None  # 스크립트 파일 경로
     audio: Optional[str] = None        # 음성 파일 경로
+    audio_duration: Optional[float] = None  # 음성 길이 (초, TTS 단계에서 측정)
     video: Optional[str] = None        # 비디오 파일 경로
+    image_previews: List[str] = field(default_factory=list)  # LLM 전송용 축소 이미지 (images와 같은 순서)
+    search_result: Optional[str] = None  # 슬라이드별 외부 검색 정보
+    prompt_tokens: Dict[str, int] = field(default_factory=dict)  # 단계별 프롬프트 토큰 수 (추정)
+    timings: Dict[str, float] = field(default_factory=dict)      # 단계별 소요 시간 (초)
+    audio_chunk_durations: List[float] = field(default_factory=list)  # TTS chunk별 음성 길이 (초, 순서대로)
 
 
 class State(TypedDict, total=False):
@@ -43,6 +55,7 @@ class State(TypedDict, total=False):
 
     # 추출 산출물
     slides: List[SlideData]            # 페이지 파싱 결과
+    search_results: List[Dict[str, str]]  # prompt.title 기반 검색 결과
 
     # 생성 산출물
     full_script_path: str              # 전체 스크립트 파일 경로
@@ -50,6 +63,42 @@ class State(TypedDict, total=False):
     # 미디어 산출물
     full_video_path: str               # 최종 결합 영상 경로
 
+    # 옵션
+    parse_cache: bool                  # 파싱 결과 캐시 사용 여부 (기본 True)
+    search_backend: str                # 검색 백엔드 (serpapi / bm25)
+    search_index_dir: str              # bm25 색인 폴더
+    search_corpus_dir: str             # bm25 색인용 강의 자료 폴더
+    llm_concurrency: int               # 슬라이드별 LLM 동시 요청 수
+    llm_cache: bool                    # LLM 응답 캐시 사용 여부 (기본 True)
+    generation_mode: str               # "two_stage"(기본) / "fused" / "batch"
+    prompt_token_budget: int           # 슬라이드당 프롬프트 컨텍스트 토큰 예산
+    speech_streaming: bool             # 스크립트 스트림을 문장 단위로 바로 TTS (two_stage 모드)
+    batch_submitter: str               # batch 모드 제출기 (openai / local)
+    batch_poll_interval: float         # batch 모드 상태 확인 주기 (초)
+    tts_concurrency: int               # 슬라이드 동시 TTS 요청 수
+    tts_speed: float                   # TTS 속도 (선택)
+    tts_instructions: str              # TTS 말투 지시문 (선택, gpt-4o-mini-tts)
+    tts_cache: bool                    # TTS 음성 캐시 사용 여부 (기본 True)
+    tts_chunking: bool                 # 스크립트를 문장 묶음으로 나눠 동시 합성
+    tts_chunk_chars: int               # 문장 묶음 최대 길이 (문자 수)
+    tts_pause: float                   # 문장 묶음 사이 무음 길이 (초)
+    tts_format: str                    # TTS 출력 형식 (mp3 / wav / pcm / aac / opus)
+    audio_profile: str                 # 영상 음성 인코딩 프로파일 (default / speech)
+    render_mode: str                   # per_slide (슬라이드별 MP4 → concat) / single_pass
+    hls_output: bool                   # 슬라이드 완성 순으로 HLS 플레이리스트 갱신 (per_slide 모드)
+    hls_playlist_path: str             # HLS 플레이리스트 경로 (media_dir/hls/lecture.m3u8)
+    video_profile: str                 # 영상 인코딩 프로파일 (default / still)
+    video_workers: int                 # 슬라이드 영상 동시 렌더링 수 (기본: 코어 수 기준)
+    video_threads: int                 # ffmpeg 1개당 -threads (기본: 코어 수 / 워커 수)
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+SNAPSHOT_DPI = 220
+IMAGE_PREVIEW_MAX_SIDE = 1024      # 축소 이미지 최대 변 길이 (px)
+IMAGE_PREVIEW_QUALITY = 85         # 축소 이미지 JPEG 품질
+
 
 # ------------------------------------------------------------
 # 유틸 함수
@@ -59,6 +108,32 @@ def clean_text(s: str) -> str:
     return re.sub(r"\s+", " ", s).strip()
 
 
+def make_image_preview(path: str, max_side: int = IMAGE_PREVIEW_MAX_SIDE) -> str:
+    """
+    원본 이미지 옆에 최대 변 길이를 제한한 RGB JPEG 축소본 생성 (이미 있으면 재사용).
+    Pillow가 열 수 없는 형식(wmf/emf 등)은 원본 경로 반환.
+    """
+    preview_path = f"{os.path.splitext(path)[0]}_{max_side}.jpg"
+    if os.path.exists(preview_path):
+        return preview_path
+
+    try:
+        with Image.open(path) as im:
+            im.thumbnail((max_side, max_side))
+            if im.mode in ("RGBA", "LA", "P"):
+                im = im.convert("RGBA")
+                bg = Image.new("RGB", im.size, (255, 255, 255))
+                bg.paste(im, mask=im.split()[-1])
+                im = bg
+            elif im.mode != "RGB":
+                im = im.convert("RGB")
+            im.save(preview_path, "JPEG", quality=IMAGE_PREVIEW_QUALITY, optimize=True)
+        return preview_path
+    except Exception as e:
+        print(f"[WARN] 축소 이미지 생성 실패 ({path}): {e}")
+        return path
+
+
 # ------------------------------------------------------------
 # PPT → PNG 스냅샷 
 # ------------------------------------------------------------
@@ -83,16 +158,7 @@ def export_slide_as_png(state: State, idx: int, dpi: int = 220) -> str:
 
     # 1) libreoffice → png
     before_png = set(work_dir.glob("*.png"))
-    subprocess.run(
-        [
-            "soffice", "--headless",
-            "-env:UserInstallation=file:///tmp/lo_profile",
-            "--convert-to", "png:impress_png_Export",
-            "--outdir", str(work_dir),
-            str(pptx),
-        ],
-        capture_output=True, text=True, env=env
-    )
+    get_lo_pool().convert(str(pptx), str(work_dir), "png:impress_png_Export")
 
     created_png = [p for p in work_dir.glob("*.png") if p not in before_png]
 
@@ -104,16 +170,7 @@ def export_slide_as_png(state: State, idx: int, dpi: int = 220) -> str:
 
     # 2) fallback: pdf → png
     pdf_path = work_dir / f"{pptx.stem}.pdf"
-    subprocess.run(
-        [
-            "soffice", "--headless",
-            "-env:UserInstallation=file:///tmp/lo_profile",
-            "--convert-to", "pdf:impress_pdf_Export",
-            "--outdir", str(work_dir),
-            str(pptx),
-        ],
-        capture_output=True, text=True, env=env
-    )
+    get_lo_pool().convert(str(pptx), str(work_dir), "pdf:impress_pdf_Export")
 
     # pdf → png
     subprocess.run(
@@ -132,60 +189,232 @@ def export_slide_as_png(state: State, idx: int, dpi: int = 220) -> str:
     return str(fallback_path)
 
 
+# ------------------------------------------------------------
+# PPT → PNG 스냅샷 (덱 단위 1회 변환)
+# ------------------------------------------------------------
+
+def pdf_page_count(pdf_path: Path, env: Optional[dict] = None) -> int:
+    """pdfinfo로 PDF 페이지 수 확인 (실패 시 0)"""
+    try:
+        out = subprocess.check_output(
+            ["pdfinfo", str(pdf_path)], stderr=subprocess.STDOUT, env=env
+        ).decode(errors="ignore")
+        m = re.search(r"^Pages:\s+(\d+)", out, re.MULTILINE)
+        return int(m.group(1)) if m else 0
+    except Exception:
+        return 0
+
+
+def _scan_pngs(work_dir: Path, prefix: str) -> Dict[int, str]:
+    """pdftoppm 출력 파일 → {슬라이드 인덱스: 경로} (번호 0 채움 대응: slide_img-01.png 등)"""
+    page_map: Dict[int, str] = {}
+    for p in work_dir.glob(f"{prefix}-*.png"):
+        m = re.search(r"-(\d+)$", p.stem)
+        if m:
+            page_map[int(m.group(1)) - 1] = str(p)
+    return page_map
+
+
+def render_pdf_pages(pdf_path: Path, out_prefix: Path, dpi: int = 220,
+                     n_pages: Optional[int] = None, workers: Optional[int] = None,
+                     chunk_pages: Optional[int] = None,
+                     env: Optional[dict] = None) -> Iterator[Tuple[int, str]]:
+    """
+    PDF 페이지 구간을 나눠 pdftoppm 프로세스를 CPU 코어 수만큼 동시에 실행하고,
+    앞 페이지부터 순서대로 (슬라이드 인덱스, PNG 경로)를 yield.
+    (각 구간은 별도 pdftoppm 프로세스 → 스레드는 프로세스 대기만 담당)
+    chunk_pages: 구간 크기 (기본: 페이지 수 / 코어 수, 스트리밍 시 1)
+    """
+    n_pages = n_pages or pdf_page_count(pdf_path, env)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_pages or 1))
+
+    def run_range(first: Optional[int], last: Optional[int]):
+        cmd = ["pdftoppm"]
+        if first is not None:
+            cmd += ["-f", str(first), "-l", str(last)]
+        cmd += ["-png", "-r", str(dpi), str(pdf_path), str(out_prefix)]
+        subprocess.run(cmd, capture_output=True, text=True, env=env)
+
+    # 페이지 수를 모르면 한 번에 렌더링
+    if not n_pages:
+        run_range(None, None)
+        yield from sorted(_scan_pngs(out_prefix.parent, out_prefix.name).items())
+        return
+
+    chunk = chunk_pages or -(-n_pages // workers)  # ceil
+    ranges = [(f, min(f + chunk - 1, n_pages)) for f in range(1, n_pages + 1, chunk)]
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        futures = [ex.submit(run_range, f, l) for f, l in ranges]
+        for (first, last), fut in zip(ranges, futures):
+            fut.result()
+            page_map = _scan_pngs(out_prefix.parent, out_prefix.name)
+            for idx in range(first - 1, last):
+                if idx in page_map:
+                    yield idx, page_map[idx]
+
+
+def iter_deck_pngs(state: State, dpi: int = 220, n_pages: Optional[int] = None,
+                   chunk_pages: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+    """
+    PPTX 전체를 한 번만 PDF로 변환한 뒤 페이지를 PNG로 렌더링하면서
+    준비된 페이지부터 (슬라이드 인덱스(0부터), PNG 경로)를 순서대로 yield.
+    변환은 상주 LibreOffice 워커 풀, 렌더링은 페이지 구간별 병렬 pdftoppm.
+    """
+    work_dir = Path(state["work_dir"]).expanduser().resolve()
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    pptx = Path(state["pptx_path"]).expanduser().resolve()
+    if not pptx.exists():
+        raise FileNotFoundError(f"PPTX 없음: {pptx}")
+
+    out_prefix = work_dir / "slide_img"
+
+    env = os.environ.copy()
+    env.update({"LANG": "ko_KR.UTF-8", "LC_ALL": "ko_KR.UTF-8"})
+
+    # 이전 실행에서 남은 PDF/스냅샷 제거 (페이지 매핑이 섞이지 않도록)
+    pdf_path = work_dir / f"{pptx.stem}.pdf"
+    if pdf_path.exists():
+        pdf_path.unlink()
+    for old in work_dir.glob(f"{out_prefix.name}-*.png"):
+        old.unlink()
+
+    # 1) libreoffice → pdf (덱 전체 1회)
+    get_lo_pool().convert(str(pptx), str(work_dir), "pdf:impress_pdf_Export")
+    if not pdf_path.exists():
+        print(f"[WARN] PDF 변환 실패: {pdf_path}")
+        return
+
+    # 2) pdf → png (페이지 구간을 나눠 병렬 렌더링)
+    yield from render_pdf_pages(pdf_path, out_prefix, dpi=dpi, n_pages=n_pages,
+                                chunk_pages=chunk_pages, env=env)
+
+
+def export_deck_as_pngs(state: State, dpi: int = 220, n_pages: Optional[int] = None) -> Dict[int, str]:
+    """
+    덱 전체 PNG 스냅샷 생성.
+    반환값: {슬라이드 인덱스(0부터): PNG 경로}
+    """
+    return dict(iter_deck_pngs(state, dpi=dpi, n_pages=n_pages))
+
+
 # ------------------------------------------------------------
 # node_parse_ppt (핵심 함수) 
 # ------------------------------------------------------------
 
-def node_parse_ppt(state: State) -> State:
+def extract_slide_content(state: State, i: int, slide) -> Tuple[List[str], List[str], List[List[str]], List[str]]:
     """
-    PPTX의 각 페이지에서 텍스트/이미지/표 추출 후 SlideData로 저장
-    PNG 스냅샷도 생성
+    슬라이드 1장에서 텍스트 / 이미지(파일 저장) / 표 추출
+    이미지는 내용 해시로 한 번만 저장하고 축소본을 함께 기록
     """
+    texts, images, tables, previews = [], [], [], []
+
+    for shape in slide.shapes:
+
+        # 텍스트 추출
+        if shape.has_text_frame:
+            for paragraph in shape.text_frame.paragraphs:
+                t = clean_text(paragraph.text)
+                if t:
+                    texts.append(t)
+
+        # 표 추출
+        elif shape.shape_type == MSO_SHAPE_TYPE.TABLE:
+            table_data = []
+            for row in shape.table.rows:
+                table_data.append([clean_text(cell.text) for cell in row.cells])
+            tables.append(table_data)
+
+        # 이미지 추출
+        elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
+            img = shape.image
+            ext = img.ext or "png"
+            blob = img.blob
+            digest = hashlib.sha1(blob).hexdigest()[:16]
+            filename = f"{state['media_dir']}/img_{digest}.{ext}"
+
+            # 반복되는 로고/템플릿 이미지는 한 번만 저장
+            if filename in images:
+                continue
+            if not os.path.exists(filename):
+                with open(filename, "wb") as f:
+                    f.write(blob)
+            images.append(filename)
+            previews.append(make_image_preview(filename))
+
+    return texts, images, tables, previews
+
+
+def iter_parse_ppt(state: State) -> Iterator[SlideData]:
+    """
+    스트리밍 파싱: 텍스트/표/이미지/PNG가 준비된 슬라이드부터 SlideData를 순서대로 yield.
+    PNG는 백그라운드 pdftoppm 프로세스들이 페이지 단위로 렌더링하므로
+    후속 단계(LLM, TTS, ffmpeg)가 첫 슬라이드부터 바로 시작할 수 있다.
+    """
+
+    # 캐시 확인 (PPTX 해시 + 래스터화 / 축소 이미지 설정)
+    raster_settings = {
+        "dpi": SNAPSHOT_DPI,
+        "preview_max_side": IMAGE_PREVIEW_MAX_SIDE,
+        "preview_quality": IMAGE_PREVIEW_QUALITY,
+    }
+    cache = get_parse_cache() if state.get("parse_cache", True) else None
+    if cache is not None:
+        cached = cache.load(state, raster_settings)
+        if cached is not None:
+            print(f"[INFO] 파싱 캐시 hit → {len(cached)}개 슬라이드 복원 {cache.stats()}")
+            for d in cached:
+                yield SlideData(**d)
+            return
 
     prs = Presentation(state["pptx_path"])
-    slides: List[SlideData] = []
+    records: List[Dict] = []   # 캐시용 스냅샷 (yield 이후 후속 단계가 채우는 값 제외)
+
+    # 덱 전체 PDF 1회 변환 후 페이지 단위 렌더링
+    png_iter = iter_deck_pngs(state, dpi=SNAPSHOT_DPI, n_pages=len(prs.slides), chunk_pages=1)
+    page_map: Dict[int, str] = {}
 
     for i, slide in enumerate(prs.slides):
-        texts, images, tables = [], [], []
-
-        for shape in slide.shapes:
-
-            # 텍스트 추출
-            if shape.has_text_frame:
-                for paragraph in shape.text_frame.paragraphs:
-                    t = clean_text(paragraph.text)
-                    if t:
-                        texts.append(t)
-
-            # 표 추출
-            elif shape.shape_type == MSO_SHAPE_TYPE.TABLE:
-                table_data = []
-                for row in shape.table.rows:
-                    table_data.append([clean_text(cell.text) for cell in row.cells])
-                tables.append(table_data)
-
-            # 이미지 추출
-            elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:
-                img = shape.image
-                ext = img.ext or "png"
-                filename = f"{state['media_dir']}/slide{i}_img{len(images)+1}.{ext}"
-                with open(filename, "wb") as f:
-                    f.write(img.blob)
-                images.append(filename)
+        texts, images, tables, previews = extract_slide_content(state, i, slide)
 
-        # 슬라이드 이미지 생성
-        slide_image = export_slide_as_png(state, i)
+        # 해당 페이지 PNG가 나올 때까지 대기
+        while i not in page_map:
+            try:
+                idx, png = next(png_iter)
+            except StopIteration:
+                break
+            page_map[idx] = png
+
+        # 슬라이드 이미지 (누락된 페이지만 개별 변환)
+        slide_image = page_map.get(i) or export_slide_as_png(state, i, dpi=SNAPSHOT_DPI)
 
         slide_data = SlideData(
             page=i,
             slide_image=slide_image,
             texts=texts,
             images=images,
-            tables=tables
+            tables=tables,
+            image_previews=previews
         )
-        slides.append(slide_data)
+        if cache is not None:
+            records.append(parse_record(slide_data))
 
         print(f"[INFO] Slide {i}: 텍스트 {len(texts)}, 이미지 {len(images)}, 표 {len(tables)}")
+        yield slide_data
+
+    png_iter.close()
+
+    if cache is not None:
+        cache.store(state, raster_settings, records)
+        print(f"[INFO] 파싱 결과 캐시 저장 {cache.stats()}")
+
+
+def node_parse_ppt(state: State) -> State:
+    """
+    PPTX의 각 페이지에서 텍스트/이미지/표 추출 후 SlideData로 저장
+    PNG 스냅샷도 생성
+    """
+    slides = list(iter_parse_ppt(state))
 
     state["slides"] = slides
     print(f"[INFO] 총 {len(slides)}개 슬라이드 파싱 완료.")
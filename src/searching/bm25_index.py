@@ -0,0 +1,223 @@
+"""
+bm25_index.py
+- 강의 자료 폴더 기반 로컬 검색 엔진 (역색인 + BM25 랭킹)
+- 색인은 numpy 배열로 저장하고 memory-map으로 열어 조회 (오프라인 / 저지연)
+- 결과 형식은 serpapi_search_by_title과 동일: [{"title", "snippet", "link"}]
+
+색인 생성:
+    python src/searching/bm25_index.py <자료 폴더> <색인 폴더>
+"""
+
+import re
+import sys
+import json
+import math
+from pathlib import Path
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple, Iterator, Optional
+
+import numpy as np
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+BM25_K1 = 1.5
+BM25_B = 0.75
+PASSAGE_WORDS = 200                 # 문서를 나누는 단락 크기 (단어 수)
+SNIPPET_CHARS = 300
+INDEX_VERSION = 1
+
+CORPUS_EXTS = {".txt", ".md", ".pptx"}
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+|[가-힣]+")
+
+
+# ------------------------------------------------------------
+# 토크나이저
+# ------------------------------------------------------------
+def tokenize(text: str) -> List[str]:
+    """
+    영문/숫자는 단어 단위, 한글은 단어 + 글자 bigram
+    (형태소 분석기 없이 조사가 붙은 단어도 매칭되도록)
+    """
+    tokens = []
+    for word in _TOKEN_RE.findall(text.lower()):
+        tokens.append(word)
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+# ------------------------------------------------------------
+# 자료 읽기
+# ------------------------------------------------------------
+def _read_text(path: Path) -> str:
+    if path.suffix.lower() == ".pptx":
+        from pptx import Presentation
+        lines = []
+        for slide in Presentation(str(path)).slides:
+            for shape in slide.shapes:
+                if shape.has_text_frame:
+                    lines.append(shape.text_frame.text)
+        return "\n".join(lines)
+    return path.read_text(encoding="utf-8", errors="ignore")
+
+
+def iter_passages(corpus_dir: str) -> Iterator[Dict[str, str]]:
+    """자료 폴더의 파일을 PASSAGE_WORDS 단어 단위 단락으로 분할"""
+    for path in sorted(Path(corpus_dir).rglob("*")):
+        if not path.is_file() or path.suffix.lower() not in CORPUS_EXTS:
+            continue
+        try:
+            words = _read_text(path).split()
+        except Exception as e:
+            print(f"[WARN] 자료 읽기 실패 ({path}): {e}")
+            continue
+
+        for n, start in enumerate(range(0, len(words), PASSAGE_WORDS)):
+            text = " ".join(words[start:start + PASSAGE_WORDS])
+            yield {
+                "title": f"{path.name} #{n + 1}",
+                "link": str(path),
+                "text": text,
+            }
+
+
+# ------------------------------------------------------------
+# 색인 생성
+# ------------------------------------------------------------
+def build_index(corpus_dir: str, index_dir: str) -> int:
+    """
+    역색인 생성 후 index_dir에 저장. 색인된 단락 수 반환.
+    - vocab.json: 단어 → [term id, df]
+    - offsets.npy: term id별 postings 시작 위치 (길이 V+1)
+    - post_docs.npy / post_tf.npy: postings (문서 id, 단어 빈도)
+    - doc_len.npy: 단락 길이 (토큰 수)
+    - docs.jsonl: 단락 메타데이터 (title, link, snippet)
+    """
+    out = Path(index_dir)
+    out.mkdir(parents=True, exist_ok=True)
+
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    doc_lens: List[int] = []
+
+    with open(out / "docs.jsonl", "w", encoding="utf-8") as f:
+        for doc_id, passage in enumerate(iter_passages(corpus_dir)):
+            tokens = tokenize(passage["text"])
+            doc_lens.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings[term].append((doc_id, tf))
+            f.write(json.dumps({
+                "title": passage["title"],
+                "link": passage["link"],
+                "snippet": passage["text"][:SNIPPET_CHARS],
+            }, ensure_ascii=False) + "\n")
+
+    terms = sorted(postings)
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    vocab = {}
+    for term_id, term in enumerate(terms):
+        offsets[term_id + 1] = offsets[term_id] + len(postings[term])
+        vocab[term] = [term_id, len(postings[term])]
+
+    post_docs = np.empty(offsets[-1], dtype=np.int32)
+    post_tf = np.empty(offsets[-1], dtype=np.float32)
+    for term_id, term in enumerate(terms):
+        docs, tfs = zip(*postings[term])
+        post_docs[offsets[term_id]:offsets[term_id + 1]] = docs
+        post_tf[offsets[term_id]:offsets[term_id + 1]] = tfs
+
+    np.save(out / "offsets.npy", offsets)
+    np.save(out / "post_docs.npy", post_docs)
+    np.save(out / "post_tf.npy", post_tf)
+    np.save(out / "doc_len.npy", np.asarray(doc_lens, dtype=np.int32))
+
+    n_docs = len(doc_lens)
+    meta = {
+        "version": INDEX_VERSION,
+        "n_docs": n_docs,
+        "avgdl": (sum(doc_lens) / n_docs) if n_docs else 0.0,
+        "corpus_dir": str(corpus_dir),
+    }
+    with open(out / "vocab.json", "w", encoding="utf-8") as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    with open(out / "meta.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    print(f"[INFO] BM25 색인 생성 완료: 단락 {n_docs}개, 단어 {len(terms)}개 → {out}")
+    return n_docs
+
+
+# ------------------------------------------------------------
+# BM25Index
+# ------------------------------------------------------------
+class BM25Index:
+    """저장된 색인을 memory-map으로 열어 BM25 검색"""
+
+    def __init__(self, index_dir: str, k1: float = BM25_K1, b: float = BM25_B):
+        d = Path(index_dir)
+        with open(d / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"BM25 색인 버전 불일치: {meta.get('version')} (필요: {INDEX_VERSION})")
+        with open(d / "vocab.json", encoding="utf-8") as f:
+            self.vocab: Dict[str, List[int]] = json.load(f)
+
+        self.n_docs = meta["n_docs"]
+        self.avgdl = meta["avgdl"] or 1.0
+        self.k1, self.b = k1, b
+
+        self.offsets = np.load(d / "offsets.npy", mmap_mode="r")
+        self.post_docs = np.load(d / "post_docs.npy", mmap_mode="r")
+        self.post_tf = np.load(d / "post_tf.npy", mmap_mode="r")
+        self.doc_len = np.load(d / "doc_len.npy", mmap_mode="r")
+
+        # 단락 메타데이터는 줄 시작 위치만 기억하고 필요할 때 읽음
+        self._docs_path = d / "docs.jsonl"
+        self._doc_pos: List[int] = []
+        with open(self._docs_path, "rb") as f:
+            pos = 0
+            for line in f:
+                self._doc_pos.append(pos)
+                pos += len(line)
+
+    def _doc(self, doc_id: int) -> Dict[str, str]:
+        with open(self._docs_path, "rb") as f:
+            f.seek(self._doc_pos[doc_id])
+            return json.loads(f.readline().decode("utf-8"))
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, str]]:
+        if self.n_docs == 0:
+            return []
+
+        scores: Optional[np.ndarray] = None
+        for term in set(tokenize(query)):
+            entry = self.vocab.get(term)
+            if entry is None:
+                continue
+            term_id, df = entry
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.post_docs[start:end]
+            tf = self.post_tf[start:end]
+
+            idf = math.log(1.0 + (self.n_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_len[docs] / self.avgdl)
+            if scores is None:
+                scores = np.zeros(self.n_docs, dtype=np.float32)
+            np.add.at(scores, docs, idf * tf * (self.k1 + 1.0) / (tf + norm))
+
+        if scores is None:
+            return []
+
+        k = min(k, self.n_docs)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self._doc(int(i)) for i in top if scores[i] > 0]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("사용법: python bm25_index.py <자료 폴더> <색인 폴더>")
+        sys.exit(1)
+    build_index(sys.argv[1], sys.argv[2])
@@ -2,11 +2,23 @@
 tool_search.py
 - serpapi 검색 기능
 - 검색 결과를 LLM 노드에서 활용하기 위한 node_tool_search 구현
+- 디스크 TTL 캐시 + keep-alive 세션 / timeout / 재시도(backoff)
+- 검색 백엔드 교체 가능 (serpapi / 로컬 bm25)
 """
 
 import os
+import re
+import threading
+from abc import ABC, abstractmethod
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, TypedDict, Optional
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from disk_cache import DiskCache, cache_dir, make_key
+from bm25_index import BM25Index, build_index
 
 
 # ------------------------------------------------------------
@@ -23,32 +35,113 @@ class State(TypedDict, total=False):
     full_video_path: str
 
 
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+SERPAPI_URL = "https://serpapi.com/search"
+SEARCH_TIMEOUT = (3.05, 10.0)       # (connect, read) 초
+SEARCH_RETRIES = 3                  # 재시도 횟수 (429/5xx/연결 오류)
+SEARCH_BACKOFF = 0.5                # 재시도 간격 = backoff * 2^n 초
+
+SEARCH_CACHE_DIR = os.getenv("SEARCH_CACHE_DIR", cache_dir("search"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", str(7 * 24 * 3600)))   # 초
+SEARCH_CACHE_MAX_MB = int(os.getenv("SEARCH_CACHE_MAX_MB", "64"))
+
+
+# ------------------------------------------------------------
+# HTTP 세션 / 검색 캐시 (프로세스 전역)
+# ------------------------------------------------------------
+_session: Optional[requests.Session] = None
+_search_cache: Optional[DiskCache] = None
+_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """keep-alive 연결 풀 + 재시도 정책이 적용된 공용 세션"""
+    global _session
+    with _lock:
+        if _session is None:
+            retry = Retry(
+                total=SEARCH_RETRIES,
+                backoff_factor=SEARCH_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def get_search_cache() -> DiskCache:
+    global _search_cache
+    with _lock:
+        if _search_cache is None:
+            _search_cache = DiskCache(
+                SEARCH_CACHE_DIR,
+                max_bytes=SEARCH_CACHE_MAX_MB * 1024 * 1024,
+                ttl=SEARCH_CACHE_TTL,
+            )
+        return _search_cache
+
+
+_warned_no_key = False
+
+
+def _warn_no_api_key():
+    """키 없음 경고는 프로세스당 한 번 (슬라이드마다 반복 출력 방지)"""
+    global _warned_no_key
+    if not _warned_no_key:
+        _warned_no_key = True
+        print("[WARN] SERPAPI_API_KEY 환경변수 없음 → 캐시에 없는 질의는 빈 검색 결과 반환")
+
+
+def normalize_query(query: str) -> str:
+    """유니코드 정규화 + 공백 정리 (캐시 키에는 대소문자 무시 버전 사용)"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", query)).strip()
+
+
 # ------------------------------------------------------------
 # serpapi 검색 함수 
 # ------------------------------------------------------------
 
-def serpapi_search_by_title(title: str, api_key: Optional[str] = None) -> List[Dict]:
+def serpapi_search_by_title(title: str, api_key: Optional[str] = None,
+                            use_cache: bool = True) -> List[Dict]:
     """
     제목 기반 검색 기능.
     원본 코드의 serpapi 관련 로직을 그대로 유지해 모듈화함.
+    같은 (정규화된 질의 + 엔진 파라미터)는 TTL 동안 디스크 캐시에서 반환.
     """
     if api_key is None:
         api_key = os.getenv("SERPAPI_API_KEY", "")
 
-    if not api_key:
-        print("[WARN] SERPAPI_API_KEY 환경변수 없음 → 빈 검색 결과 반환")
-        return []
-
-    url = "https://serpapi.com/search"
+    query = normalize_query(title)
     params = {
         "engine": "google",
-        "q": title,
-        "api_key": api_key,
+        "q": query,
         "num": 3
     }
 
+    # 캐시 확인 (질의는 대소문자 무시, api_key는 키에서 제외)
+    cache = get_search_cache() if use_cache else None
+    engine_params = {k: v for k, v in params.items() if k != "q"}
+    cache_key = make_key(query.casefold(), engine_params)
+    if cache is not None:
+        cached = cache.get_json(cache_key)
+        if cached is not None:
+            return cached
+
+    if not api_key:
+        _warn_no_api_key()
+        return []
+
     try:
-        response = requests.get(url, params=params)
+        response = get_session().get(
+            SERPAPI_URL, params={**params, "api_key": api_key}, timeout=SEARCH_TIMEOUT
+        )
+        response.raise_for_status()
         data = response.json()
 
         results = []
@@ -63,6 +156,9 @@ def serpapi_search_by_title(title: str, api_key: Optional[str] = None) -> List[D
                 }
                 results.append(entry)
 
+        if cache is not None:
+            cache.put_json(cache_key, results)
+
         return results
 
     except Exception as e:
@@ -70,29 +166,199 @@ def serpapi_search_by_title(title: str, api_key: Optional[str] = None) -> List[D
         return []
 
 
+# ------------------------------------------------------------
+# 검색 백엔드
+# ------------------------------------------------------------
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "serpapi")
+SEARCH_INDEX_DIR = os.getenv("SEARCH_INDEX_DIR", cache_dir("bm25_index"))
+SEARCH_CORPUS_DIR = os.getenv("SEARCH_CORPUS_DIR", "")
+
+
+class SearchBackend(ABC):
+    """
+    node_tool_search가 사용하는 검색 백엔드 인터페이스.
+    search() 결과 형식: [{"title", "snippet", "link"}]
+    """
+    name = ""
+
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def search(self, query: str) -> List[Dict]:
+        ...
+
+
+class SerpApiBackend(SearchBackend):
+    """
+    SerpAPI (Google) 검색.
+    API 키가 없어도 TTL 캐시에 있는 질의는 답할 수 있으므로 항상 사용 가능
+    (캐시 miss + 키 없음 → 빈 결과)
+    """
+    name = "serpapi"
+
+    def search(self, query: str) -> List[Dict]:
+        return serpapi_search_by_title(query)
+
+
+class BM25Backend(SearchBackend):
+    """
+    강의 자료 폴더 기반 로컬 BM25 검색 (오프라인).
+    색인이 없고 corpus_dir가 주어지면 처음 한 번 색인을 만든다.
+    """
+    name = "bm25"
+
+    def __init__(self, index_dir: str = SEARCH_INDEX_DIR, corpus_dir: str = SEARCH_CORPUS_DIR):
+        self.index = None
+        index_dir = os.path.expanduser(index_dir)
+        if not os.path.exists(os.path.join(index_dir, "meta.json")) and corpus_dir:
+            build_index(corpus_dir, index_dir)
+        if os.path.exists(os.path.join(index_dir, "meta.json")):
+            self.index = BM25Index(index_dir)
+
+    def available(self) -> bool:
+        return self.index is not None
+
+    def search(self, query: str) -> List[Dict]:
+        return self.index.search(query, k=3)
+
+
+SEARCH_BACKENDS = {
+    "serpapi": SerpApiBackend,
+    "bm25": BM25Backend,
+}
+
+_backends: Dict[tuple, SearchBackend] = {}
+
+
+def get_search_backend(state: Optional[dict] = None) -> SearchBackend:
+    """
+    state["search_backend"] (없으면 SEARCH_BACKEND 환경변수)로 백엔드 선택.
+    bm25는 state["search_index_dir"], state["search_corpus_dir"] 사용.
+    같은 설정의 백엔드는 재사용 (색인 memory-map을 한 번만 연다)
+    """
+    state = state or {}
+    name = state.get("search_backend") or SEARCH_BACKEND
+    if name not in SEARCH_BACKENDS:
+        raise ValueError(f"알 수 없는 검색 백엔드: {name} (지원: {', '.join(SEARCH_BACKENDS)})")
+
+    kwargs = {}
+    if name == "bm25":
+        kwargs = {
+            "index_dir": state.get("search_index_dir") or SEARCH_INDEX_DIR,
+            "corpus_dir": state.get("search_corpus_dir") or SEARCH_CORPUS_DIR,
+        }
+
+    key = (name, tuple(sorted(kwargs.items())))
+    with _lock:
+        if key not in _backends:
+            _backends[key] = SEARCH_BACKENDS[name](**kwargs)
+        return _backends[key]
+
+
+# ------------------------------------------------------------
+# 슬라이드별 검색
+# ------------------------------------------------------------
+SEARCH_CONCURRENCY = 8              # 동시 검색 요청 수
+SLIDE_QUERY_MAX_CHARS = 80          # 슬라이드 질의 최대 길이
+
+
+def slide_query(slide) -> str:
+    """
+    슬라이드 텍스트에서 검색 질의 생성.
+    첫 줄(보통 제목)에 이어지는 줄을 최대 길이까지 덧붙임.
+    """
+    query = ""
+    for text in getattr(slide, "texts", []):
+        candidate = f"{query} {text}".strip()
+        if query and len(candidate) > SLIDE_QUERY_MAX_CHARS:
+            break
+        query = candidate[:SLIDE_QUERY_MAX_CHARS]
+    return normalize_query(query)
+
+
+def format_search_results(results: List[Dict]) -> str:
+    """검색 결과 → LLM 프롬프트용 문자열"""
+    lines = []
+    for r in results:
+        line = f"- {r.get('title', '')}: {r.get('snippet', '')}"
+        if r.get("link"):
+            line += f" ({r['link']})"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def safe_search(backend: SearchBackend, query: str) -> List[Dict[str, str]]:
+    """검색 실패(인덱스 없음/손상 등)는 빈 결과로 처리 — serpapi 경로와 동일하게 계속 진행"""
+    try:
+        return backend.search(query)
+    except Exception as e:
+        print(f"[WARN] 검색 실패 ({backend.name}, \"{query}\"): {e} → 빈 결과")
+        return []
+
+
+def search_slides(slides: list, backend: Optional[SearchBackend] = None,
+                  max_workers: int = SEARCH_CONCURRENCY) -> int:
+    """
+    슬라이드별 질의를 만들고 중복 질의는 한 번만 검색해 동시 실행.
+    결과는 각 slide.search_result에 문자열로 저장. 검색한 고유 질의 수 반환.
+    """
+    backend = backend or get_search_backend()
+    queries = {}
+    for slide in slides:
+        q = slide_query(slide)
+        if q:
+            queries.setdefault(q.casefold(), q)
+
+    if not queries:
+        return 0
+
+    keys = list(queries)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(keys)))) as ex:
+        results = dict(zip(keys, ex.map(lambda k: safe_search(backend, queries[k]), keys)))
+
+    for slide in slides:
+        q = slide_query(slide)
+        if q:
+            slide.search_result = format_search_results(results[q.casefold()])
+
+    return len(keys)
+
+
 # ------------------------------------------------------------
 # node_tool_search — LLM의 AssistantContext에 들어갈 external info 생성
 # ------------------------------------------------------------
 
 def node_tool_search(state: State) -> State:
     """
-    프롬프트 안의 'title'을 기반으로 serpapi 검색.
+    프롬프트 안의 'title'을 기반으로 검색.
     검색 결과를 state["search_results"]에 저장.
-
-    원본 node_tool_search 기능을 그대로 수행.
+    이어서 슬라이드별 질의를 동시 검색해 slide.search_result에 저장.
+    검색 백엔드는 state["search_backend"]로 선택 (serpapi / bm25)
     """
+    backend = get_search_backend(state)
 
     # prompt 내부에 title이 있어야 한다
     if "prompt" not in state or "title" not in state["prompt"]:
-        print("[WARN] prompt.title 없음 → 검색 건너뜀")
+        print("[WARN] prompt.title 없음 → 제목 검색 건너뜀")
         state["search_results"] = []
-        return state
+    else:
+        title = state["prompt"]["title"]
+
+        print(f"[INFO] 검색 실행: \"{title}\"")
+        results = safe_search(backend, title) if backend.available() else []
+        print(f"[INFO] 검색 결과 {len(results)}개 수집됨")
 
-    title = state["prompt"]["title"]
+        state["search_results"] = results
 
-    print(f"[INFO] 검색 실행: \"{title}\"")
-    results = serpapi_search_by_title(title)
-    print(f"[INFO] 검색 결과 {len(results)}개 수집됨")
+    # 슬라이드별 검색
+    slides = state.get("slides", [])
+    if not slides:
+        return state
+    if not backend.available():
+        print(f"[WARN] 검색 백엔드 '{backend.name}' 사용 불가 → 슬라이드별 검색 건너뜀")
+        return state
 
-    state["search_results"] = results
+    n_queries = search_slides(slides, backend)
+    print(f"[INFO] 슬라이드 {len(slides)}개 → 고유 질의 {n_queries}개 동시 검색 완료")
     return state
@@ -0,0 +1,211 @@
+"""
+hls_output.py
+- 점진적 HLS 출력 (state["hls_output"] = True)
+- 슬라이드 영상이 완성되는 대로 재인코딩 없이 TS 세그먼트로 나누고(-c copy),
+  media_dir/hls/lecture.m3u8 (EVENT 플레이리스트)에 슬라이드 순서대로 추가
+- 앞 슬라이드가 모두 끝난 구간까지만 공개 → 재생 중 순서가 바뀌지 않음
+- 슬라이드 사이에는 #EXT-X-DISCONTINUITY (슬라이드별 타임스탬프가 0부터 시작)
+- 최종 MP4는 기존 node_concat(-c copy)이 그대로 생성
+"""
+
+import math
+import os
+import subprocess
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ppt_parser import SlideData
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+HLS_DIRNAME = "hls"
+HLS_PLAYLIST = "lecture.m3u8"
+HLS_SEGMENT_SEC = 6            # 목표 세그먼트 길이 (-c copy라 실제 분할은 키프레임 위치)
+
+Segment = Tuple[str, float]    # (세그먼트 파일명, 길이 초)
+
+
+def hls_playlist_path(media_dir: str) -> str:
+    return os.path.join(media_dir, HLS_DIRNAME, HLS_PLAYLIST)
+
+
+# ------------------------------------------------------------
+# 슬라이드 영상 → 세그먼트
+# ------------------------------------------------------------
+def _read_segments(playlist_path: str) -> List[Segment]:
+    """ffmpeg가 쓴 슬라이드별 m3u8에서 (파일명, 길이) 목록"""
+    segments = []
+    duration = None
+    with open(playlist_path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF:"):
+                duration = float(line[len("#EXTINF:"):].split(",")[0])
+            elif line and not line.startswith("#") and duration is not None:
+                segments.append((line, duration))
+                duration = None
+    return segments
+
+
+def segment_slide_video(video_path: str, hls_dir: str, page: int,
+                        segment_sec: float = HLS_SEGMENT_SEC) -> List[Segment]:
+    """슬라이드 MP4를 재인코딩 없이 slide{page}_NNN.ts 세그먼트로 분할"""
+    name = f"slide{page:03d}"
+    playlist = os.path.join(hls_dir, f"{name}.m3u8")
+    subprocess.check_call([
+        "ffmpeg", "-y", "-v", "error",
+        "-i", video_path,
+        "-c", "copy",
+        "-f", "hls",
+        "-hls_time", str(segment_sec),
+        "-hls_list_size", "0",
+        "-hls_playlist_type", "vod",
+        "-hls_segment_filename", os.path.join(hls_dir, f"{name}_%03d.ts"),
+        playlist,
+    ])
+    return _read_segments(playlist)
+
+
+# ------------------------------------------------------------
+# 강의 플레이리스트
+# ------------------------------------------------------------
+class HlsPlaylist:
+    """
+    슬라이드 세그먼트를 페이지 순서대로 이어 붙이는 EVENT 플레이리스트.
+    add_slide는 여러 스레드에서 임의 순서로 호출되어도 되며,
+    next_page부터 연속으로 준비된 슬라이드까지만 파일에 반영한다.
+    """
+
+    def __init__(self, hls_dir: str, first_page: int = 0):
+        self.hls_dir = hls_dir
+        self.path = os.path.join(hls_dir, HLS_PLAYLIST)
+        self.next_page = first_page
+        self.pending: Dict[int, List[Segment]] = {}
+        self.published: List[List[Segment]] = []
+        self.ended = False
+        self._lock = threading.Lock()
+
+    def add_slide(self, page: int, segments: List[Segment]) -> None:
+        """영상이 없는 슬라이드도 빈 목록으로 알려야 뒤 슬라이드가 공개됨"""
+        with self._lock:
+            self.pending[page] = segments
+            advanced = False
+            while self.next_page in self.pending:
+                slide_segments = self.pending.pop(self.next_page)
+                if slide_segments:
+                    self.published.append(slide_segments)
+                self.next_page += 1
+                advanced = True
+            if advanced:
+                self._write()
+
+    def finish(self) -> None:
+        """남은 슬라이드를 페이지 순으로 모두 공개하고 #EXT-X-ENDLIST 기록"""
+        with self._lock:
+            for page in sorted(self.pending):
+                if self.pending[page]:
+                    self.published.append(self.pending[page])
+            self.pending.clear()
+            self.ended = True
+            self._write()
+
+    def _write(self) -> None:
+        durations = [d for segs in self.published for _, d in segs]
+        target = max([HLS_SEGMENT_SEC] + [math.ceil(d) for d in durations])
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:EVENT",
+            f"#EXT-X-TARGETDURATION:{target}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for i, segs in enumerate(self.published):
+            if i > 0:
+                lines.append("#EXT-X-DISCONTINUITY")
+            for name, duration in segs:
+                lines.append(f"#EXTINF:{duration:.3f},")
+                lines.append(name)
+        if self.ended:
+            lines.append("#EXT-X-ENDLIST")
+
+        tmp = f"{self.path}.part"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, self.path)
+
+
+_playlists: Dict[str, HlsPlaylist] = {}
+_playlists_lock = threading.Lock()
+
+
+def _new_playlist(state: dict) -> HlsPlaylist:
+    """첫 페이지는 state["slides"]의 최소 page (스트리밍 파싱 중이면 0, SlideData.page는 0부터)"""
+    hls_dir = os.path.join(state["media_dir"], HLS_DIRNAME)
+    os.makedirs(hls_dir, exist_ok=True)
+    pages = [s.page for s in state.get("slides") or []]
+    return HlsPlaylist(hls_dir, min(pages, default=0))
+
+
+def start_hls(state: dict) -> Optional[HlsPlaylist]:
+    """
+    영상 단계 시작 시 호출. 같은 media_dir에 이전 실행이 남긴 플레이리스트(예외로 finish_hls를
+    못 거친 경우)와 lecture.m3u8을 버리고 새로 시작
+    """
+    if not state.get("hls_output"):
+        return None
+    playlist = _new_playlist(state)
+    if os.path.exists(playlist.path):
+        os.remove(playlist.path)
+    with _playlists_lock:
+        _playlists[state["media_dir"]] = playlist
+    return playlist
+
+
+def get_hls_playlist(state: dict) -> Optional[HlsPlaylist]:
+    """state["hls_output"]가 켜져 있으면 media_dir별 플레이리스트 (없으면 생성)"""
+    if not state.get("hls_output"):
+        return None
+    media_dir = state["media_dir"]
+    with _playlists_lock:
+        if media_dir not in _playlists:
+            _playlists[media_dir] = _new_playlist(state)
+        return _playlists[media_dir]
+
+
+# ------------------------------------------------------------
+# 파이프라인 연결
+# ------------------------------------------------------------
+def publish_slide(slide: SlideData, state: dict) -> None:
+    """
+    슬라이드 영상 처리 직후 호출 (성공/실패/건너뜀 모두).
+    분할에 실패해도 파이프라인은 계속 진행 (해당 슬라이드만 플레이리스트에서 빠짐)
+    """
+    playlist = get_hls_playlist(state)
+    if playlist is None:
+        return
+
+    segments: List[Segment] = []
+    if slide.video and os.path.exists(slide.video):
+        try:
+            segments = segment_slide_video(slide.video, playlist.hls_dir, slide.page)
+        except (subprocess.CalledProcessError, OSError, ValueError) as e:
+            print(f"[WARN] Page {slide.page} HLS 세그먼트 생성 실패: {e}")
+    playlist.add_slide(slide.page, segments)
+
+
+def finish_hls(state: dict) -> Optional[str]:
+    """
+    플레이리스트 종료 표시 + 등록 해제. 경로 반환 (HLS 미사용 / 이미 종료했으면 None).
+    영상 단계의 finally에서 호출 → 중간에 예외가 나도 다음 실행에 남지 않음
+    """
+    if not state.get("hls_output"):
+        return None
+    with _playlists_lock:
+        playlist = _playlists.pop(state["media_dir"], None)
+    if playlist is None:
+        return None
+    playlist.finish()
+    print(f"[INFO] HLS 플레이리스트 완료 → {playlist.path}")
+    return playlist.path
@@ -0,0 +1,134 @@
+"""
+lecture_render.py
+- node_render_lecture: 슬라이드별 중간 MP4 없이 final_lecture.mp4를 한 번에 인코딩
+  (state["render_mode"] = "single_pass")
+- 영상 입력: 슬라이드 이미지 + 음성 길이(duration)를 적은 ffconcat 목록
+- 음성 입력: 슬라이드 음성을 순서대로 이은 ffconcat 목록 (pcm은 바이트 연결)
+- ffmpeg 1회 실행 → 프로세스 N개 / 중간 파일 / -c copy 병합 시 코덱 파라미터 불일치 문제 제거
+"""
+
+import os
+import shutil
+import time
+from typing import List
+
+from ppt_parser import SlideData
+from script_generator import State
+from media_info import media_duration
+from video_maker import (
+    AUDIO_PROFILE, VIDEO_PROFILE,
+    audio_input_args, audio_codec_args, resolve_video_profile, video_codec_args,
+    prescale_image, render_plan, run_ffmpeg,
+)
+
+
+# ------------------------------------------------------------
+# 설정
+# ------------------------------------------------------------
+DEFAULT_FPS = 25               # default 프로파일 출력 프레임레이트 (render_mp4의 이미지 입력 기본값과 동일)
+
+
+# ------------------------------------------------------------
+# ffconcat 목록
+# ------------------------------------------------------------
+def _quote(path: str) -> str:
+    """ffconcat file 지시문용 경로 (작은따옴표 이스케이프)"""
+    return "'" + os.path.abspath(path).replace("'", "'\\''") + "'"
+
+
+def write_image_list(images: List[str], durations: List[float], list_path: str) -> str:
+    """
+    이미지별 표시 시간을 적은 ffconcat 목록.
+    concat demuxer는 마지막 항목의 duration을 무시하므로 마지막 이미지를 한 번 더 적는다
+    """
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for image, duration in zip(images, durations):
+            f.write(f"file {_quote(image)}\n")
+            f.write(f"duration {duration:.3f}\n")
+        f.write(f"file {_quote(images[-1])}\n")
+    return list_path
+
+
+def concat_audio_input(audio_paths: List[str], base_path: str) -> List[str]:
+    """
+    슬라이드 음성을 순서대로 이어 읽는 ffmpeg 입력 옵션 (-i 포함).
+    헤더 없는 pcm은 바이트 연결 파일, 그 외 형식은 ffconcat 목록
+    """
+    if audio_paths[0].lower().endswith(".pcm"):
+        joined = base_path + ".pcm"
+        with open(joined, "wb") as out:
+            for path in audio_paths:
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        return [*audio_input_args(joined), "-i", joined]
+
+    list_path = base_path + "_audio.txt"
+    with open(list_path, "w", encoding="utf-8") as f:
+        f.write("ffconcat version 1.0\n")
+        for path in audio_paths:
+            f.write(f"file {_quote(path)}\n")
+    return ["-f", "concat", "-safe", "0", "-i", list_path]
+
+
+# ------------------------------------------------------------
+# node_render_lecture
+# ------------------------------------------------------------
+def node_render_lecture(state: State) -> State:
+    """
+    음성이 있는 슬라이드를 순서대로 모아 final_lecture.mp4를 한 번에 생성.
+    결과는 state["full_video_path"]에 저장 (slide.video는 만들지 않음)
+    """
+    slides: List[SlideData] = [s for s in state.get("slides", []) if s.audio and s.slide_image]
+    if not slides:
+        print("[WARNING] 렌더링할 슬라이드가 없습니다.")
+        return state
+
+    profile = resolve_video_profile(state.get("video_profile", VIDEO_PROFILE))
+    still = profile == "still"
+
+    durations = []
+    for slide in slides:
+        if not slide.audio_duration:
+            slide.audio_duration = media_duration(slide.audio)
+        durations.append(slide.audio_duration)
+
+    media_dir = state["media_dir"]
+    base = os.path.join(media_dir, "final_lecture")
+    output_final = base + ".mp4"
+    images = [prescale_image(s.slide_image) if still else s.slide_image for s in slides]
+    image_list = write_image_list(images, durations, base + "_images.txt")
+    audio_input = concat_audio_input([s.audio for s in slides], base)
+
+    # 코어 전체를 ffmpeg 1개에 배분
+    _, threads = render_plan(state, 1)
+
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-f", "concat", "-safe", "0", "-i", image_list,
+        *audio_input,
+        "-map", "0:v", "-map", "1:a",
+        "-t", f"{sum(durations):.3f}",
+        *video_codec_args(profile),
+        *([] if still else ["-r", str(DEFAULT_FPS)]),   # still은 video_codec_args에 -r 포함
+        "-threads", str(threads),
+        *audio_codec_args(slides[0].audio, state.get("audio_profile", AUDIO_PROFILE)),
+        output_final,
+    ]
+
+    t0 = time.time()
+    try:
+        run_ffmpeg(cmd, output_final)
+    finally:
+        for path in (image_list, base + "_audio.txt", base + ".pcm"):
+            if os.path.exists(path):
+                os.remove(path)
+    print(f"[INFO] 최종 영상 단일 인코딩 완료 → {output_final} "
+          f"(슬라이드 {len(slides)}개, {sum(durations):.1f} sec, {time.time() - t0:.1f} sec 소요)")
+
+    return {
+        **state,
+        "slides": state["slides"],
+        "full_video_path": output_final,
+    }
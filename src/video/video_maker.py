@@ -2,94 +2,260 @@
 video_maker.py
 - node_make_video / render_mp4
 - ffmpeg 기반 슬라이드별 영상 생성
+- 음성 트랙: TTS 출력 형식(tts_format)에 맞춰 입력 옵션 지정,
+  AAC 출력은 재인코딩 없이 복사 / 그 외는 오디오 프로파일(audio_profile)로 인코딩
+- 영상 프로파일(video_profile): default(25fps + scale 필터, x264 기본값) /
+  still(미리 축소한 이미지, 낮은 fps, -tune stillimage, 긴 GOP, CRF)
+- 슬라이드 영상 병렬 렌더링: 워커 수 x ffmpeg -threads 가 CPU 코어 수를 넘지 않게 배분
 - 모듈화
 """
 
 import os
 import subprocess
-from typing import List, Dict, TypedDict
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, TypedDict, Optional, Tuple
 from dataclasses import dataclass
 
+from PIL import Image
+
 from ppt_parser import SlideData
 from script_generator import State  # 동일한 State 구조 사용
+from media_info import media_duration, PCM_SAMPLE_RATE, PCM_CHANNELS
+from hls_output import start_hls, publish_slide, finish_hls
+
 
 # ------------------------------------------------------------
-# ffprobe_duration (원본과 동일)
+# 오디오 프로파일
 # ------------------------------------------------------------
-def ffprobe_duration(path: str) -> float:
-    cmd = [
-        "ffprobe",
-        "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=nokey=1:noprint_wrappers=1",
-        path
-    ]
-    try:
-        out = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode().strip()
-        return float(out)
-    except:
-        return 0.0
+# TTS 음성은 24kHz 모노 음성이라 speech 프로파일로 충분 (파일 크기/인코딩 시간 감소)
+AUDIO_PROFILES = {
+    "default": ["-c:a", "aac", "-b:a", "192k"],
+    "speech": ["-c:a", "aac", "-b:a", "64k", "-ac", "1"],
+}
+AUDIO_PROFILE = os.getenv("AUDIO_PROFILE", "default")
+
+
+def audio_input_args(audio_path: str) -> List[str]:
+    """헤더 없는 PCM(24kHz/16bit/mono)은 입력 형식을 명시"""
+    if audio_path.lower().endswith(".pcm"):
+        return ["-f", "s16le", "-ar", str(PCM_SAMPLE_RATE), "-ac", str(PCM_CHANNELS)]
+    return []
+
+
+def audio_codec_args(audio_path: str, profile: str = AUDIO_PROFILE) -> List[str]:
+    """AAC(ADTS) 음성은 스트림 복사, 그 외는 프로파일대로 AAC 인코딩"""
+    if audio_path.lower().endswith(".aac"):
+        return ["-c:a", "copy", "-bsf:a", "aac_adtstoasc"]
+    if profile not in AUDIO_PROFILES:
+        print(f"[WARN] 알 수 없는 audio_profile '{profile}' → default 사용")
+        profile = "default"
+    return AUDIO_PROFILES[profile]
+
+
+# ------------------------------------------------------------
+# 영상 프로파일
+# ------------------------------------------------------------
+VIDEO_SIZE = (1280, 720)
+VIDEO_PROFILE = os.getenv("VIDEO_PROFILE", "default")
+VIDEO_PROFILES = ("default", "still")
+
+# still: 같은 프레임 반복이라 fps를 낮춰도 화질 차이 없음 (영상 길이 단위 = 1/fps 초)
+STILL_FPS = 5
+STILL_GOP_SEC = 60             # 키프레임 간격 (초)
+STILL_CRF = 28
+
+
+def prescale_image(image_path: str, size: Tuple[int, int] = VIDEO_SIZE) -> str:
+    """
+    ffmpeg scale 필터 대신 영상 해상도로 미리 줄인 PNG ({원본}_{w}x{h}.png).
+    이미 있고 원본보다 새로우면 재사용
+    """
+    w, h = size
+    out = f"{os.path.splitext(image_path)[0]}_{w}x{h}.png"
+    if os.path.exists(out) and os.path.getmtime(out) >= os.path.getmtime(image_path):
+        return out
+
+    with Image.open(image_path) as img:
+        img = img.convert("RGB")
+        if img.size != size:
+            img = img.resize(size, Image.LANCZOS)
+        tmp = f"{out}.{os.getpid()}.part"
+        img.save(tmp, format="PNG")
+    os.replace(tmp, out)
+    return out
+
+
+def resolve_video_profile(profile: str) -> str:
+    """지원하지 않는 프로파일은 default"""
+    if profile not in VIDEO_PROFILES:
+        print(f"[WARN] 알 수 없는 video_profile '{profile}' → default 사용")
+        return "default"
+    return profile
+
+
+def video_codec_args(profile: str) -> List[str]:
+    """영상 인코딩 옵션 (default는 scale 필터 포함, still은 미리 축소한 이미지 전제)"""
+    if resolve_video_profile(profile) == "still":
+        return [
+            "-c:v", "libx264",
+            "-tune", "stillimage",
+            "-crf", str(STILL_CRF),
+            "-g", str(STILL_FPS * STILL_GOP_SEC),
+            "-pix_fmt", "yuv420p",
+            "-r", str(STILL_FPS),
+        ]
+    w, h = VIDEO_SIZE
+    return ["-vf", f"scale={w}:{h}", "-c:v", "libx264"]
+
+
+def video_args(image_path: str, profile: str = VIDEO_PROFILE) -> Tuple[List[str], List[str]]:
+    """(이미지 입력 옵션, 영상 인코딩 옵션)"""
+    profile = resolve_video_profile(profile)
+    if profile == "still":
+        inputs = ["-framerate", str(STILL_FPS), "-loop", "1", "-i", prescale_image(image_path)]
+    else:
+        inputs = ["-loop", "1", "-i", image_path]
+    return inputs, video_codec_args(profile)
+
+
+# ------------------------------------------------------------
+# 병렬 렌더링 설정
+# ------------------------------------------------------------
+VIDEO_WORKERS = int(os.getenv("VIDEO_WORKERS", "0"))   # 0: CPU 코어 수 기준 자동
+VIDEO_THREADS_PER_JOB = 2                              # 자동 배분 시 ffmpeg 1개당 스레드 수
+
+
+def render_plan(state: State, workers: Optional[int] = None) -> Tuple[int, int]:
+    """
+    (동시 ffmpeg 수, ffmpeg 1개당 -threads)
+    state["video_workers"] / state["video_threads"]가 없으면 코어 수로 계산.
+    workers x threads <= 코어 수 → 과다 할당(oversubscription) 방지
+    """
+    cores = os.cpu_count() or 1
+    workers = workers or state.get("video_workers") or VIDEO_WORKERS \
+        or max(1, cores // VIDEO_THREADS_PER_JOB)
+    workers = max(1, min(workers, cores))
+    threads = state.get("video_threads") or max(1, cores // workers)
+    return workers, threads
 
 
 # ------------------------------------------------------------
 # render_mp4
 # ------------------------------------------------------------
-def render_mp4(image_path: str, audio_path: str, output_path: str) -> str:
+def run_ffmpeg(cmd: List[str], output_path: str) -> str:
+    """ffmpeg 실행. 실패하면 불완전한 출력 파일을 지우고 RuntimeError (stderr 마지막 몇 줄 포함)"""
+    print(f"[INFO] ffmpeg 실행 → {output_path}")
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        if os.path.exists(output_path):
+            os.remove(output_path)
+        err = result.stderr.decode(errors="replace").strip().splitlines()[-5:]
+        raise RuntimeError(f"ffmpeg 실패 (exit {result.returncode}): {output_path}\n" + "\n".join(err))
+    return output_path
+
+
+def render_mp4(image_path: str, audio_path: str, output_path: str,
+               audio_dur: Optional[float] = None,
+               audio_profile: str = AUDIO_PROFILE,
+               threads: Optional[int] = None,
+               video_profile: str = VIDEO_PROFILE) -> str:
     """
     이미지 1장 + 음성 1개를 하나의 MP4 영상으로 변환
-    원본 render_mp4 그대로 사용
+    audio_dur: TTS 단계에서 측정한 음성 길이 (없으면 여기서 측정)
+    audio_profile: AUDIO_PROFILES 키 (AAC 음성은 복사하므로 무시)
+    threads: ffmpeg -threads (없으면 ffmpeg 기본값 = 전체 코어)
+    video_profile: "default" / "still" (video_args 참고)
+    ffmpeg가 실패하면 불완전한 출력 파일을 지우고 RuntimeError
     """
 
-    audio_dur = ffprobe_duration(audio_path)
+    if not audio_dur:
+        audio_dur = media_duration(audio_path)
     if audio_dur <= 0:
         print(f"[WARNING] 음성 길이 측정 실패: {audio_path}")
 
+    video_inputs, video_codec = video_args(image_path, video_profile)
     cmd = [
         "ffmpeg",
         "-y",
-        "-loop", "1",
-        "-i", image_path,
+        *video_inputs,
+        *audio_input_args(audio_path),
         "-i", audio_path,
         "-t", str(audio_dur),
-        "-vf", "scale=1280:720",
-        "-c:v", "libx264",
-        "-c:a", "aac",
-        "-b:a", "192k",
+        *video_codec,
+        *(["-threads", str(threads)] if threads else []),
+        *audio_codec_args(audio_path, audio_profile),
         "-shortest",
         output_path
     ]
 
-    print(f"[INFO] ffmpeg 실행 → {output_path}")
-    subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
-    return output_path
+    return run_ffmpeg(cmd, output_path)
 
 
 # ------------------------------------------------------------
 # node_make_video
 # ------------------------------------------------------------
+def make_slide_video(slide: SlideData, state: State, threads: Optional[int] = None) -> None:
+    """
+    슬라이드 1장의 이미지 + 오디오 → MP4 생성, slide.video에 경로 기록.
+    threads가 없으면 render_plan 기준. 소요 시간은 slide.timings["video"]
+    """
+    if not slide.audio:
+        print(f"[WARNING] Page {slide.page}: audio 없음 → 영상 생성 건너뜀")
+        return
+
+    image_path = slide.slide_image
+    audio_path = slide.audio
+    video_path = os.path.join(
+        state["media_dir"],
+        f"{slide.page}_video.mp4"
+    )
+
+    if threads is None:
+        _, threads = render_plan(state)
+
+    t0 = time.time()
+    render_mp4(image_path, audio_path, video_path, slide.audio_duration,
+               state.get("audio_profile", AUDIO_PROFILE), threads,
+               state.get("video_profile", VIDEO_PROFILE))
+    slide.timings["video"] = time.time() - t0
+
+    slide.video = video_path
+    print(f"[INFO] Page {slide.page}: 영상 생성 완료 → {video_path}")
+
+
 def node_make_video(state: State) -> State:
     """
-    각 슬라이드별 이미지 + 오디오 → MP4 생성
-    slide.video 경로 저장
+    각 슬라이드별 이미지 + 오디오 → MP4 생성 (render_plan 크기의 스레드 풀, 슬라이드 순서 유지)
+    slide.video 경로 저장. ffmpeg가 실패한 슬라이드는 video 없이 남는다.
+    state["hls_output"]이면 완성된 슬라이드부터 HLS 플레이리스트에 추가
     """
+    slides = state.get("slides", [])
+    workers, threads = render_plan(state)
 
-    for slide in state.get("slides", []):
-        if not slide.audio:
-            print(f"[WARNING] Page {slide.page}: audio 없음 → 영상 생성 건너뜀")
-            continue
+    def run(slide: SlideData):
+        try:
+            make_slide_video(slide, state, threads)
+        except Exception as e:
+            print(f"[ERROR] Page {slide.page} 영상 생성 실패: {e}")
+        finally:
+            publish_slide(slide, state)
 
-        image_path = slide.slide_image
-        audio_path = slide.audio
-        video_path = os.path.join(
-            state["media_dir"],
-            f"{slide.page}_video.mp4"
-        )
+    # ffmpeg는 별도 프로세스라 스레드 풀로 충분 (GIL 영향 없음)
+    t0 = time.time()
+    start_hls(state)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(run, slides))
+    finally:
+        hls_path = finish_hls(state)
 
-        render_mp4(image_path, audio_path, video_path)
+    done = sum(1 for s in slides if s.video)
+    print(f"[INFO] 영상 생성 완료: {done}/{len(slides)}개, {time.time() - t0:.1f} sec "
+          f"(동시 {workers} x ffmpeg -threads {threads})")
 
-        slide.video = video_path
-        print(f"[INFO] Page {slide.page}: 영상 생성 완료 → {video_path}")
+    if hls_path:
+        return {**state, "slides": state["slides"], "hls_playlist_path": hls_path}
 
     return {
         **state,
@@ -0,0 +1,109 @@
+"""
+test_disk_cache.py
+- DiskCache의 LRU 제거(크기 상한), TTL 만료, 동시 저장, hit/miss 통계 확인
+
+실행:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import time
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "common"))
+
+from disk_cache import DiskCache, make_key
+
+
+def _put_bytes(cache: DiskCache, key: str, size: int):
+    def fill(d):
+        (d / "blob").write_bytes(bytes(size))
+    return cache.put(key, fill)
+
+
+def _age(path, seconds: float):
+    t = time.time() - seconds
+    os.utime(path, (t, t))
+
+
+def test_put_and_get_roundtrip(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    key = make_key("model", {"b": 2, "a": 1}, "text")
+    assert key == make_key("model", {"a": 1, "b": 2}, "text")
+
+    assert cache.get_json(key) is None
+    cache.put_json(key, {"answer": "값"})
+    assert cache.get_json(key) == {"answer": "값"}
+
+
+def test_evicts_least_recently_used_over_max_bytes(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=250)
+    a = _put_bytes(cache, "a", 100)
+    b = _put_bytes(cache, "b", 100)
+    _age(a, 100)
+    _age(b, 50)
+
+    # a를 조회하면 최근 사용으로 바뀌어 b가 가장 오래된 엔트리가 됨
+    assert cache.get("a") is not None
+    _put_bytes(cache, "c", 100)
+
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert not b.exists()
+
+
+def test_expired_entry_is_a_miss_and_removed(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20, ttl=10)
+    entry = _put_bytes(cache, "k", 10)
+    assert cache.get("k") is not None
+
+    _age(entry / ".complete", 20)
+    assert cache.get("k") is None
+    assert not entry.exists()
+
+
+def test_evict_drops_expired_entries(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20, ttl=10)
+    old = _put_bytes(cache, "old", 10)
+    _put_bytes(cache, "new", 10)
+    _age(old / ".complete", 20)
+
+    cache.evict()
+    assert not old.exists()
+    assert cache.get("new") is not None
+
+
+def test_concurrent_put_same_key(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    errors = []
+
+    def worker():
+        try:
+            _put_bytes(cache, "same", 1000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert (cache.get("same") / "blob").stat().st_size == 1000
+    assert not [p for p in tmp_path.iterdir() if p.name.startswith(".tmp-")]
+
+
+def test_stats_accumulate_across_instances(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    _put_bytes(cache, "k", 10)
+    cache.get("k")
+    cache.get("missing")
+    assert cache.stats() == {"hits": 1, "misses": 1, "total_hits": 1, "total_misses": 1}
+
+    again = DiskCache(str(tmp_path), max_bytes=1 << 20)
+    again.get("k")
+    stats = again.stats()
+    assert (stats["hits"], stats["total_hits"], stats["total_misses"]) == (1, 2, 1)
@@ -0,0 +1,100 @@
+"""
+test_hls_output.py
+- HLS 플레이리스트가 슬라이드 완성 순서와 무관하게 페이지 순서(0부터)로 공개되는지 확인
+
+실행:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+
+for sub in ("video", "parsing", "common"):
+    sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", sub))
+
+import pytest
+
+import hls_output
+from ppt_parser import SlideData
+
+
+def _slide(page: int, video: str) -> SlideData:
+    slide = SlideData(page=page, slide_image="", texts=[], images=[], tables=[])
+    slide.video = video
+    return slide
+
+
+def _playlist_segments(path: str):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip().endswith(".ts")]
+
+
+@pytest.fixture
+def fake_segmenter(monkeypatch):
+    """ffmpeg 없이 슬라이드당 세그먼트 2개를 돌려주는 분할기"""
+    def segment(video_path, hls_dir, page, segment_sec=hls_output.HLS_SEGMENT_SEC):
+        return [(f"slide{page:03d}_000.ts", 6.0), (f"slide{page:03d}_001.ts", 2.5)]
+    monkeypatch.setattr(hls_output, "segment_slide_video", segment)
+
+
+def test_pages_published_in_order_from_zero(tmp_path, fake_segmenter):
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"mp4")
+    slides = [_slide(page, str(video)) for page in range(5)]
+    state = {"media_dir": str(tmp_path), "hls_output": True, "slides": slides}
+    playlist = hls_output.hls_playlist_path(str(tmp_path))
+
+    # 뒤 슬라이드부터 끝나도 0번이 준비되기 전에는 공개하지 않음
+    for page in (3, 1, 4, 2):
+        hls_output.publish_slide(slides[page], state)
+    assert not os.path.exists(playlist)
+
+    hls_output.publish_slide(slides[0], state)
+    expected = [f"slide{page:03d}_{i:03d}.ts" for page in range(5) for i in range(2)]
+    assert _playlist_segments(playlist) == expected
+
+    hls_output.finish_hls(state)
+    with open(playlist, encoding="utf-8") as f:
+        text = f.read()
+    assert _playlist_segments(playlist) == expected
+    assert text.count("#EXT-X-DISCONTINUITY") == 4
+    assert text.rstrip().endswith("#EXT-X-ENDLIST")
+
+
+def test_slide_without_video_does_not_block(tmp_path, fake_segmenter):
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"mp4")
+    slides = [_slide(0, str(video)), _slide(1, None), _slide(2, str(video))]
+    state = {"media_dir": str(tmp_path), "hls_output": True, "slides": slides}
+
+    for slide in (slides[2], slides[0], slides[1]):
+        hls_output.publish_slide(slide, state)
+
+    playlist = hls_output.hls_playlist_path(str(tmp_path))
+    assert _playlist_segments(playlist) == [
+        "slide000_000.ts", "slide000_001.ts", "slide002_000.ts", "slide002_001.ts",
+    ]
+    hls_output.finish_hls(state)
+
+
+def test_new_run_discards_unfinished_playlist(tmp_path, fake_segmenter):
+    video = tmp_path / "v.mp4"
+    video.write_bytes(b"mp4")
+    slides = [_slide(page, str(video)) for page in range(3)]
+    state = {"media_dir": str(tmp_path), "hls_output": True, "slides": slides}
+    playlist = hls_output.hls_playlist_path(str(tmp_path))
+
+    # 이전 실행: 0~1번만 공개된 채 finish_hls 없이 중단
+    hls_output.start_hls(state)
+    hls_output.publish_slide(slides[1], state)
+    hls_output.publish_slide(slides[0], state)
+    assert os.path.exists(playlist)
+
+    # 새 실행은 0번부터 다시 시작하고 이전 플레이리스트 파일도 지움
+    hls_output.start_hls(state)
+    assert not os.path.exists(playlist)
+    hls_output.publish_slide(slides[0], state)
+    assert _playlist_segments(playlist) == ["slide000_000.ts", "slide000_001.ts"]
+
+    assert hls_output.finish_hls(state) == playlist
+    assert hls_output.finish_hls(state) is None
@@ -0,0 +1,160 @@
+"""
+test_media_info.py
+- 합성 헤더로 만든 MP3 / WAV / AAC(ADTS) / Opus(Ogg) / PCM 파일의
+  길이(media_duration)와 (샘플레이트, 채널 수)(audio_params)를 ffprobe 없이 읽는지 확인
+
+실행:
+    python -m pytest -q tests
+"""
+
+import os
+import sys
+import struct
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "common"))
+
+import pytest
+
+import media_info
+from media_info import media_duration, audio_params
+
+
+@pytest.fixture(autouse=True)
+def no_ffprobe(monkeypatch):
+    """헤더 파싱이 실패하면 ffprobe 대신 눈에 띄는 값이 나오도록"""
+    monkeypatch.setattr(media_info, "ffprobe_duration", lambda path: -1.0)
+    monkeypatch.setattr(media_info, "ffprobe_params", lambda path: None)
+
+
+def _write(tmp_path, name: str, data: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+# ------------------------------------------------------------
+# 합성 파일
+# ------------------------------------------------------------
+def _mp3_frame(header: bytes, frame_len: int, tag: bytes = b"", tag_offset: int = 0) -> bytes:
+    frame = bytearray(frame_len)
+    frame[:4] = header
+    if tag:
+        frame[tag_offset:tag_offset + len(tag)] = tag
+    return bytes(frame)
+
+
+def mp3_mpeg1_stereo(n_frames: int, xing: bool = False, id3: bool = False) -> bytes:
+    """MPEG-1 Layer III, 128 kbps, 44.1 kHz, joint stereo (프레임 417바이트, 1152샘플)"""
+    header = bytes([0xFF, 0xFB, 0x90, 0x44])
+    frames = [_mp3_frame(header, 417) for _ in range(n_frames)]
+    if xing:
+        frames.insert(0, _mp3_frame(header, 417, b"Xing", 4 + 32))
+    data = b"".join(frames)
+    if id3:
+        data = b"ID3\x03\x00\x00\x00\x00\x00\x0a" + bytes(10) + data
+    return data
+
+
+def mp3_mpeg2_mono(n_frames: int) -> bytes:
+    """MPEG-2 Layer III, 64 kbps, 24 kHz, mono (TTS 출력과 같은 형식, 프레임 192바이트, 576샘플)"""
+    header = bytes([0xFF, 0xF3, 0x84, 0xC4])
+    return b"".join(_mp3_frame(header, 192) for _ in range(n_frames))
+
+
+def wav(sample_rate: int, channels: int, seconds: float, streaming: bool = False) -> bytes:
+    """16bit PCM WAV (streaming=True면 TTS 스트리밍처럼 data 크기 0)"""
+    block = channels * 2
+    payload = bytes(int(sample_rate * seconds) * block)
+    fmt = struct.pack("<HHIIHH", 1, channels, sample_rate, sample_rate * block, block, 16)
+    data_size = 0 if streaming else len(payload)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", data_size) + payload
+    return b"RIFF" + struct.pack("<I", len(body)) + body
+
+
+def adts(n_frames: int, rate_idx: int = 6, channels: int = 1, frame_len: int = 100) -> bytes:
+    """AAC-LC ADTS 프레임 (rate_idx 6 = 24 kHz, 프레임당 1024샘플)"""
+    header = bytes([
+        0xFF, 0xF1,
+        (1 << 6) | (rate_idx << 2) | (channels >> 2),
+        ((channels & 0x03) << 6) | ((frame_len >> 11) & 0x03),
+        (frame_len >> 3) & 0xFF,
+        ((frame_len & 0x07) << 5) | 0x1F,
+        0xFC,
+    ])
+    return (header + bytes(frame_len - 7)) * n_frames
+
+
+def ogg_opus(seconds: float, channels: int = 1, pre_skip: int = 312) -> bytes:
+    """첫 페이지에 OpusHead, 마지막 페이지 granule = pre_skip + 48kHz 샘플 수"""
+    head = b"OpusHead" + bytes([1, channels]) + struct.pack("<HIhB", pre_skip, 24000, 0, 0)
+    first = b"OggS" + bytes([0, 2]) + struct.pack("<q", 0) + bytes(13) + head
+    granule = pre_skip + int(48000 * seconds)
+    last = b"OggS" + bytes([0, 4]) + struct.pack("<q", granule) + bytes(13) + bytes(200)
+    return first + bytes(500) + last
+
+
+# ------------------------------------------------------------
+# media_duration
+# ------------------------------------------------------------
+def test_mp3_duration_counts_frames(tmp_path):
+    path = _write(tmp_path, "a.mp3", mp3_mpeg1_stereo(100))
+    assert media_duration(path) == pytest.approx(100 * 1152 / 44100)
+
+
+def test_mp3_duration_skips_id3_and_xing(tmp_path):
+    path = _write(tmp_path, "a.mp3", mp3_mpeg1_stereo(50, xing=True, id3=True))
+    assert media_duration(path) == pytest.approx(50 * 1152 / 44100)
+
+
+def test_mp3_mpeg2_duration(tmp_path):
+    path = _write(tmp_path, "a.mp3", mp3_mpeg2_mono(250))
+    assert media_duration(path) == pytest.approx(250 * 576 / 24000)
+
+
+def test_wav_duration(tmp_path):
+    path = _write(tmp_path, "a.wav", wav(24000, 1, 1.5))
+    assert media_duration(path) == pytest.approx(1.5)
+
+
+def test_streaming_wav_uses_file_length(tmp_path):
+    path = _write(tmp_path, "a.wav", wav(24000, 1, 0.75, streaming=True))
+    assert media_duration(path) == pytest.approx(0.75)
+
+
+def test_adts_duration(tmp_path):
+    path = _write(tmp_path, "a.aac", adts(75))
+    assert media_duration(path) == pytest.approx(75 * 1024 / 24000)
+
+
+def test_opus_duration_subtracts_pre_skip(tmp_path):
+    path = _write(tmp_path, "a.opus", ogg_opus(2.5))
+    assert media_duration(path) == pytest.approx(2.5)
+
+
+def test_pcm_duration(tmp_path):
+    path = _write(tmp_path, "a.pcm", bytes(24000 * 2 * 3))
+    assert media_duration(path) == pytest.approx(3.0)
+
+
+def test_unparsable_falls_back_to_ffprobe(tmp_path):
+    path = _write(tmp_path, "a.mp3", b"not audio at all")
+    assert media_duration(path) == -1.0
+
+
+# ------------------------------------------------------------
+# audio_params
+# ------------------------------------------------------------
+@pytest.mark.parametrize("name, data, expected", [
+    ("a.mp3", mp3_mpeg1_stereo(3, id3=True), (44100, 2)),
+    ("a.mp3", mp3_mpeg2_mono(3), (24000, 1)),
+    ("a.wav", wav(22050, 2, 0.1), (22050, 2)),
+    ("a.aac", adts(3, rate_idx=3, channels=2), (48000, 2)),
+    ("a.opus", ogg_opus(1.0, channels=2), (48000, 2)),
+    ("a.pcm", bytes(100), (24000, 1)),
+])
+def test_audio_params(tmp_path, name, data, expected):
+    assert audio_params(_write(tmp_path, name, data)) == expected
+
+
+def test_audio_params_unparsable_returns_none(tmp_path):
+    assert audio_params(_write(tmp_path, "a.aac", bytes(64))) is None